@@ -1,4 +1,8 @@
-from src.main import main
+import multiprocessing
 
 if __name__ == '__main__':
+    # The OCR processes are started from the exe when frozen
+    multiprocessing.freeze_support()
+    # Imported here so the OCR processes, which import this file, don't load the GUI
+    from src.main import main
     main()
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QShowEvent, QFont, QColor, QPalette
-from PySide6.QtWidgets import QMainWindow, QMessageBox, QTableWidgetItem, QTextEdit, QHBoxLayout
+from PySide6.QtWidgets import QMainWindow, QMessageBox, QTableWidgetItem, QTextEdit, QHBoxLayout, QLabel
 from src.SettingsForm import SettingsForm
 from src.MainWindow_ui import Ui_MainWindow
 from src.appdata import AppDataPaths
@@ -14,9 +14,11 @@ from src.device_launch_monitor_bluetooth_mlm2pro import DeviceLaunchMonitorBluet
 from src.device_launch_monitor_bluetooth_r10 import DeviceLaunchMonitorBluetoothR10
 from src.device_launch_monitor_relay_server import DeviceLaunchMonitorRelayServer
 from src.devices import Devices
+from src.launch_monitor_profile import LaunchMonitorProfiles
 from src.log_message import LogMessage, LogMessageSystems, LogMessageTypes
 from src.putting_settings import PuttingSettings
 from src.settings import Settings, LaunchMonitor
+from src.shot_timing import ShotTimingLog
 from src.PuttingForm import PuttingForm
 from src.gspro_connection import GSProConnection
 from src.device_launch_monitor_screenshot import DeviceLaunchMonitorScreenshot
@@ -48,6 +50,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.app_paths.setup()
         self.__setup_logging()
         self.settings = Settings(self.app_paths)
+        self.shot_timing_log = ShotTimingLog(ShotTimingLog.default_path(self.app_paths))
         self.gspro_connection = GSProConnection(self)
         self.settings_form = SettingsForm(settings=self.settings, app_paths=self.app_paths)
         self.putting_settings = PuttingSettings(self.app_paths)
@@ -99,15 +102,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.log_table.setColumnWidth(LogTableCols.message, 1000)
         self.log_table.resizeRowsToContents()
         self.log_table.setTextElideMode(Qt.ElideNone)
-        headings = ['Result']
         vla = list(BallData.properties).index(BallMetrics.VLA)+1
         hla = list(BallData.properties).index(BallMetrics.HLA)+1
-        for metric in BallData.properties:
-            headings.append(BallData.properties[metric])
         self.shot_history_table.resizeRowsToContents()
         self.shot_history_table.setTextElideMode(Qt.ElideNone)
-        self.shot_history_table.setColumnCount(len(BallData.properties)+1)
-        self.shot_history_table.setHorizontalHeaderLabels(headings)
         self.shot_history_table.setColumnWidth(vla, 150)
         self.shot_history_table.setColumnWidth(hla, 150)
         font = QFont()
@@ -120,6 +118,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.restart_button.setEnabled(False)
         self.pause_button.setEnabled(False)
         self.settings_form.saved.connect(self.__settings_saved)
+        self.shot_latency_label = QLabel('Shot latency p50: - p95: -')
+        self.statusbar.addPermanentWidget(self.shot_latency_label)
         # Find and load refs to all edit fields
         self.__find_edit_fields()
 
@@ -173,12 +173,35 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                     self.launch_monitor = DeviceLaunchMonitorBluetoothR10(self)
                 self.actionDevices.setEnabled(False)
             self.launch_monitor_groupbox.setTitle(f"{self.settings.device_id} Launch Monitor")
+            self.__shot_history_headings()
+
+    def __shot_history_headings(self):
+        # Metrics are named as the selected launch monitor names them
+        labels = LaunchMonitorProfiles.get(self.settings.device_id).labels
+        headings = ['Result']
+        for metric in BallData.properties:
+            headings.append(labels[metric])
+        self.shot_history_table.setColumnCount(len(BallData.properties)+1)
+        self.shot_history_table.setHorizontalHeaderLabels(headings)
 
     def __restart_connector(self):
         self.launch_monitor.resume()
 
     def shot_sent(self, balldata):
         self.__add_shot_history_row(balldata)
+        if balldata.timing is not None:
+            self.__update_shot_latency(balldata)
+
+    def __update_shot_latency(self, balldata):
+        queue_stats = self.gspro_connection.gspro_connect.queue_stats()
+        self.shot_timing_log.add(balldata.timing, launch_monitor=balldata.launch_monitor, club=balldata.club, send_queue=queue_stats)
+        p50, p95 = self.shot_timing_log.percentiles()
+        self.shot_latency_label.setText(f'Shot latency p50: {p50:.0f}ms p95: {p95:.0f}ms')
+        stages = self.shot_timing_log.stage_percentiles()
+        tooltip = [f'{stage}: p50 {stages[stage][0]:.1f}ms p95 {stages[stage][1]:.1f}ms' for stage in stages]
+        tooltip.append(f"Send queue depth: {queue_stats['depth']} max: {queue_stats['max_depth']} "
+                       f"rejected: {queue_stats['rejected']} timeouts: {queue_stats['timeouts']}")
+        self.shot_latency_label.setToolTip('\n'.join(tooltip))
 
     def __pause_connector(self):
         self.launch_monitor.pause()
@@ -193,6 +216,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.putting.shutdown()
         logging.debug(f'{MainWindow.app_name} Closing launch monitor connection')
         self.launch_monitor.shutdown()
+        self.shot_timing_log.close()
 
     def __settings(self):
         self.settings_form.show()
@@ -14,6 +14,7 @@ class RoisExPuttForm(RoisFormBase):
         self.setup_ui()
 
     def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
         # Reload settings to ensure we are using the latest
         self.settings.load()
         if len(self.settings.exputt['rois']) <= 0:
@@ -13,6 +13,7 @@ class RoisForm(RoisFormBase):
         self.setup_ui()
 
     def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
         # Reload settings to ensure we are using the latest
         self.device.load()
         if len(self.device.rois) <= 0:
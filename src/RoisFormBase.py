@@ -4,9 +4,9 @@ from PySide6.QtWidgets import QMainWindow, QMessageBox
 
 from src.RoisForm_ui import Ui_RoisForm
 from src.VerifyRoiForm import VerifyRoiForm
-from src.ball_data import BallData, BallMetrics
+from src.launch_monitor_profile import LaunchMonitorProfiles
+from src.screenshot_viewer import ScreenshotViewer
 from src.log_message import LogMessageTypes, LogMessageSystems
-from src.settings import LaunchMonitor
 
 
 class RoisFormBase(QMainWindow, Ui_RoisForm):
@@ -19,57 +19,18 @@ class RoisFormBase(QMainWindow, Ui_RoisForm):
         self.setupUi(self)
         self.main_window = main_window
         self.thread = QThread()
-        self.verify_roi = VerifyRoiForm(self.__rois_properties())
+        self.verify_roi = VerifyRoiForm(self.__launch_monitor_profile())
+        self.roi_viewer = ScreenshotViewer()
         self.device = None
         self.current_button = None
 
-    def __rois_properties(self):
+    def __launch_monitor_profile(self):
         if self.__class__.__name__ == 'RoisExPuttForm':
-            rois_properties = BallData.rois_putting_properties
-            BallData.properties[BallMetrics.HLA] = "Launch Dir"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Putter path"
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = "Impact Angle"
-        elif self.main_window.settings.device_id == LaunchMonitor.UNEEKOR or self.main_window.settings.device_id == LaunchMonitor.UNEEKOR_IPAD :
-            rois_properties = BallData.rois_uneekor_properties
-            BallData.properties[BallMetrics.VLA] = "Launch Angle"
-            BallData.properties[BallMetrics.HLA] = "Side Angle"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Club path"
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = "Attack Angle"
-        elif self.main_window.settings.device_id ==  LaunchMonitor.MEVOPLUS:
-            rois_properties = BallData.rois_mevoplus_properties
-            BallData.properties[BallMetrics.VLA] = "Launch V"
-            BallData.properties[BallMetrics.HLA] = "Launch H"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Club path"
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = 'AOA'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = 'Face to target'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_PATH] = 'Face to path'
-        elif self.main_window.settings.device_id ==  LaunchMonitor.R50:
-            rois_properties = BallData.rois_r50_properties
-            BallData.properties[BallMetrics.HLA] = "Launch Direction"
-            BallData.properties[BallMetrics.VLA] = "Launch Angle"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Club path"
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = "Attack Angle"
-            BallData.properties[BallMetrics.CLUB_FACE_TO_PATH] = 'Face to Path'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = 'Club Face'
-        elif self.main_window.settings.device_id ==  LaunchMonitor.SKYTRAKPLUS :
-            rois_properties = BallData.rois_skytrak_properties
-            BallData.properties[BallMetrics.VLA] = "Launch Angle"
-            BallData.properties[BallMetrics.HLA] = "Side Angle"
-            BallData.properties[BallMetrics.CLUB_PATH] = 'Club path'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = 'Face to target'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_PATH] = 'Face to path'
-        else :
-            rois_properties = BallData.rois_properties
-            BallData.properties[BallMetrics.HLA] = "Launch Direction (HLA)"
-            BallData.properties[BallMetrics.VLA] = "Launch Angle (VLA)"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Club path"
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = "Angle of Attack"
-            BallData.properties[BallMetrics.CLUB_FACE_TO_PATH] = 'Impact Angle'
-
-        return rois_properties
+            return LaunchMonitorProfiles.exputt
+        return LaunchMonitorProfiles.get(self.main_window.settings.device_id)
 
     def setup_ui(self):
-        self.roi_graphics_layout.addItem(self.roi_image)
+        self.roi_graphics_layout.addItem(self.roi_viewer)
         self.close_button.clicked.connect(self.__close)
         self.save_button.clicked.connect(self.save)
         self.reset_button.clicked.connect(self.reset)
@@ -91,12 +52,18 @@ class RoisFormBase(QMainWindow, Ui_RoisForm):
     def reset(self):
         pass
 
+    def showEvent(self, event):
+        # Frames are only sent to the viewer while the form is shown
+        self.roi_viewer.attach(self.roi_image)
+        super().showEvent(event)
+
     def closeEvent(self, event):
+        self.roi_viewer.detach()
         self.closed.emit()
         super().closeEvent(event)
 
     def __zoom(self, in_or_out):
-        self.roi_image.zoom(in_or_out)
+        self.roi_viewer.zoom(in_or_out)
 
     def in_progress(self):
         self.__log_message(LogMessageTypes.STATUS_BAR, f'Taking screenshot...')
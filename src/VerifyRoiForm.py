@@ -3,13 +3,14 @@ from PySide6 import QtGui
 from PySide6.QtWidgets import QWidget
 from src.VerifyRoiForm_ui import Ui_VerifyRoiForm
 from src.ball_data import BallData
+from src.launch_monitor_profile import LaunchMonitorProfile
 
 
 class VerifyRoiForm(QWidget, Ui_VerifyRoiForm):
 
-    def __init__(self, rois_properties):
+    def __init__(self, profile: LaunchMonitorProfile):
         super().__init__()
-        self.rois_properties = rois_properties
+        self.profile = profile
         self.setupUi(self)
         self.close_button.clicked.connect(self.__close)
         self.balldata = {}
@@ -24,9 +25,9 @@ class VerifyRoiForm(QWidget, Ui_VerifyRoiForm):
     def __load_results(self):
         self.results_view.clear()
         items = []
-        for roi in self.rois_properties:
+        for roi in self.profile.rois:
             value = getattr(self.balldata, roi)
             if int(value) == BallData.invalid_value:
                 value = 'Invalid Value'
-            items.append(f'{BallData.properties[roi]}: {value}')
+            items.append(f'{self.profile.labels[roi]}: {value}')
         self.results_view.addItems(items)
@@ -131,6 +131,21 @@ class BallData:
 
     MLM2_MISREAD_SHOT = '0000000000000000000000000000000000000000'
 
+    # Fixed attributes rather than a __dict__, a BallData is created for every screenshot read
+    __slots__ = ('putt_type', 'good_shot', 'new_shot', 'launch_monitor', 'corrections', 'errors', 'timing') + \
+        tuple(properties)
+    # Attributes in the order to_json() has always written them
+    json_attributes = ('putt_type', 'new_shot', 'launch_monitor', 'corrections') + tuple(properties)
+    # to_gspro() as JSON, laid out exactly as json.dumps() would so the bytes sent to GSPro don't change
+    gspro_json_format = (
+        '{"BallData": {"Speed": %s, "SpinAxis": %s, "TotalSpin": %s, "HLA": %s, "VLA": %s, '
+        '"Backspin": %s, "SideSpin": %s, "CarryDistance": 0}, '
+        '"ClubData": {"Speed": %s, "AngleOfAttack": %s, "FaceToTarget": %s, "Lie": 0, "Loft": 0, '
+        '"Path": %s, "SpeedAtImpact": %s, "VerticalFaceImpact": 0, "HorizontalFaceImpact": %s, "ClosureRate": 0}, '
+        '"ShotDataOptions": {"ContainsBallData": true, "ContainsClubData": true, "LaunchMonitorIsReady": true, '
+        '"LaunchMonitorBallDetected": true, "IsHeartBeat": false}}')
+    gspro_payload_format = '{"DeviceID": %s, "Units": %s, "ShotNumber": %s, "APIversion": %s, ' + gspro_json_format[1:]
+
     def __init__(self, *initial_data, **kwargs):
         self.putt_type = None
         self.good_shot = False
@@ -138,6 +153,7 @@ class BallData:
         self.launch_monitor = None
         self.corrections = {}
         self.errors = {}
+        self.timing = None
         for key in BallData.properties:
             setattr(self, key, 0)
         for dictionary in initial_data:
@@ -148,12 +164,12 @@ class BallData:
 
     def __copy__(self):
         obj = type(self).__new__(self.__class__)
-        obj.__dict__.update(self.__dict__)
+        for key in BallData.__slots__:
+            setattr(obj, key, getattr(self, key))
         return obj
 
     def to_json(self):
-        return json.dumps(self,
-                          default=lambda o: dict((key, value) for key, value in o.__dict__.items() if key != 'errors' and key != 'good_shot'))
+        return json.dumps(dict((key, getattr(self, key)) for key in BallData.json_attributes))
 
     @staticmethod
     def ballcolor_as_list():
@@ -197,6 +213,34 @@ class BallData:
         }
         return payload
 
+    @staticmethod
+    def __json_value(value):
+        # Same text as json.dumps() for the value
+        if type(value) is float and math.isfinite(value):
+            return float.__repr__(value)
+        if type(value) is int:
+            return int.__repr__(value)
+        return json.dumps(value)
+
+    def __gspro_values(self):
+        values = (self.speed, self.spin_axis, self.total_spin, self.hla, self.vla, self.back_spin, self.side_spin,
+                  self.club_speed, self.angle_of_attack, self.face_to_target, self.path, self.speed_at_impact,
+                  self.face_to_path)
+        if all(type(value) is int or (type(value) is float and math.isfinite(value)) for value in values):
+            # Usual case, json.dumps() writes ints and finite floats as their repr()
+            return tuple(map(repr, values))
+        return tuple(map(BallData.__json_value, values))
+
+    def to_gspro_json(self):
+        """to_gspro() as JSON text, without building the dictionaries."""
+        return BallData.gspro_json_format % self.__gspro_values()
+
+    def to_gspro_payload(self, device_id, units, shot_number, api_version) -> bytes:
+        """The bytes of the Open API shot message, the same as json.dumps() of the device fields and to_gspro()."""
+        value = BallData.__json_value
+        return (BallData.gspro_payload_format %
+                ((value(device_id), value(units), value(shot_number), value(api_version)) + self.__gspro_values())).encode('utf-8')
+
     def from_gspro(self, payload):
         self.speed = payload['BallData']['Speed']
         self.spin_axis = payload['BallData']['SpinAxis']
@@ -212,6 +256,13 @@ class BallData:
         if 'Path' in payload['ClubData']:
             self.path = payload['ClubData']['Path']
             self.face_to_target = payload['ClubData']['FaceToTarget']
+        # The rest of the club data to_gspro() sends, so a journaled shot is resent as it was
+        if 'AngleOfAttack' in payload['ClubData']:
+            self.angle_of_attack = payload['ClubData']['AngleOfAttack']
+        if 'SpeedAtImpact' in payload['ClubData']:
+            self.speed_at_impact = payload['ClubData']['SpeedAtImpact']
+        if 'HorizontalFaceImpact' in payload['ClubData']:
+            self.face_to_path = payload['ClubData']['HorizontalFaceImpact']
 
     def process_putt_data(self, ocr_result, roi, previous_balldata):
         self.putt_type = PuttType.EXPUTT
@@ -259,7 +310,7 @@ class BallData:
                 raise ValueError(f"Value for '{BallData.properties[roi]}' is 0")
             if roi == BallMetrics.SPEED:
                 if result > 40:
-                    result = self.__fix_out_of_bounds_metric(40, result, roi)
+                    result = BallData.fix_out_of_bounds_metric(40, result, roi)
                     self.corrections[roi] = True
                 setattr(self, BallMetrics.CLUB_SPEED, result)
             elif roi == BallMetrics.HLA and (result > 20 or result < -20):
@@ -267,7 +318,7 @@ class BallData:
                     sign = -1
                 else:
                     sign = 1
-                result = self.__fix_out_of_bounds_metric(20, (result * sign), roi)
+                result = BallData.fix_out_of_bounds_metric(20, (result * sign), roi)
                 result = result * sign
                 self.corrections[roi] = True
             # Round all values to one decimal place
@@ -283,135 +334,6 @@ class BallData:
                 self.errors[roi] = msg
                 setattr(self, roi, BallData.invalid_value)
 
-    def process_shot_data(self, ocr_result, roi, previous_balldata, selected_club, offline_mode):
-        msg = None
-        result = ''
-        try:
-            # Strip non ascii chars and commas
-            ocr_result = re.sub(r',', r'', re.sub(r'[^\x00-\x7f]', r'', ocr_result))
-            logging.debug(f'remove non ASCII {roi}: {ocr_result.strip()}')
-            cleaned_result = re.findall(r"[LR]?[-+]?(?:\d*\.*\d+)[LR]?", ocr_result)
-            if isinstance(cleaned_result, list or tuple) and len(cleaned_result) > 0:
-                cleaned_result = cleaned_result[0]
-            logging.debug(f'cleaned result {roi}: {cleaned_result}')
-            if len(cleaned_result) > 0:
-                cleaned_result = cleaned_result.strip()
-            if len(cleaned_result) <= 0:
-                logging.debug(f"Value for {BallData.properties[roi]} is empty")
-                cleaned_result = '0'
-            # Remove any leading '.' sometimes a - is read as a '.'
-            result = cleaned_result.lstrip('.')
-            if self.launch_monitor == LaunchMonitor.MEVOPLUS:
-                if len(result) > 1 and (roi == BallMetrics.HLA or roi == BallMetrics.SPIN_AXIS or roi == BallMetrics.CLUB_PATH or 
-                    roi == BallMetrics.CLUB_FACE_TO_TARGET or roi == BallMetrics.CLUB_FACE_TO_PATH or roi == BallMetrics.ANGLE_OF_ATTACK):
-                    result = result.upper()
-                    if result.endswith('L'):
-                        result = -float(result[:-1])
-                    else :
-                        result = float(result[:-1])
-                else :
-                    result = float(result)
-                if roi == BallMetrics.SPIN_AXIS and offline_mode == 'Yes':
-                    old_result = result
-                    result = float(result * 0.4)
-                    logging.debug(f"{self.launch_monitor} is in offline mode, adjusting {BallData.properties[roi]} from: {old_result} to: {result}")
-                if roi == BallMetrics.VLA:
-                    if result == 0.5: # this value of VLA is observed when MEVO+ failed to register a chip shot properly
-                        raise ValueError(f"Detected problematic VLA = 0.5 for {self.launch_monitor}. Ignoring the shot")
-            if self.launch_monitor == LaunchMonitor.R50:
-                if len(result) > 1 and (roi == BallMetrics.HLA or roi == BallMetrics.SPIN_AXIS or roi == BallMetrics.CLUB_PATH or
-                    roi == BallMetrics.CLUB_FACE_TO_TARGET or roi == BallMetrics.CLUB_FACE_TO_PATH or roi == BallMetrics.ANGLE_OF_ATTACK):
-                    result = result.upper()
-                    if result.endswith('L'):
-                        result = -float(result[:-1])
-                    else :
-                        result = float(result[:-1])
-                else :
-                    result = float(result)
-            elif self.launch_monitor == LaunchMonitor.UNEEKOR or self.launch_monitor == LaunchMonitor.XSWINGPRO:
-                if len(result)>1 and (roi == BallMetrics.SIDE_SPIN or roi == BallMetrics.CLUB_PATH or roi == BallMetrics.HLA):                  
-                    result = result.upper()
-                    if result.endswith('L'):
-                        result = -float(result[:-1])
-                    else:
-                        result = float(result[:-1])
-                else :
-                    result = float(result)
-            elif self.launch_monitor == LaunchMonitor.SC4:
-                result = float(result)
-                if result <= 0 and (roi == BallMetrics.TOTAL_SPIN or roi == BallMetrics.VLA) and selected_club in ['PW', 'SW', 'GW', 'LW']:
-                    if roi == BallMetrics.TOTAL_SPIN:
-                        result = 5000
-                        logging.debug(
-                            f"{self.launch_monitor} value read for {BallData.properties[roi]} is 0, changing value to: {result}")
-                    elif roi == BallMetrics.VLA:
-                        result = 36
-                        logging.debug(
-                            f"{self.launch_monitor} value read for {BallData.properties[roi]} is 0, changing value to: {result}")
-            elif self.launch_monitor == LaunchMonitor.SQUARE:
-                if len(result) > 1 and (roi == BallMetrics.SPIN_AXIS or roi == BallMetrics.HLA):
-                    result = result.upper()
-                    if result.startswith('L'):
-                        result = -float(result[1:])
-                    elif result.startswith('R'):
-                        result = float(result[1:])
-                else:
-                    result = float(result)
-            elif self.launch_monitor == LaunchMonitor.SKYTRAKPLUS and roi == BallMetrics.HLA :
-                result = float(result)
-                if result < -40 or result > 40 : # assume a misread, or the word "Center"
-                    self.corrections[roi] = True
-                    result = 0
-            else:
-                result = float(result)
-            logging.debug(f'result {roi}: {result}')
-            # Check values are not 0
-            if self.launch_monitor == LaunchMonitor.UNEEKOR or self.launch_monitor == LaunchMonitor.UNEEKOR_IPAD:
-                if roi in BallData.must_not_be_zero_uneekor and result == float(0):
-                    raise ValueError(f"Value for '{BallData.properties[roi]}' is 0")
-            elif self.launch_monitor == LaunchMonitor.R50:
-                if roi in BallData.must_not_be_zero_r50 and result == float(0):
-                    raise ValueError(f"Value for '{BallData.properties[roi]}' is 0")
-            else :
-                if roi in BallData.must_not_be_zero and result == float(0):
-                    raise ValueError(f"Value for '{BallData.properties[roi]}' is 0")
-            if roi == BallMetrics.VLA and (result <= 0 or result >= 90):
-                raise ValueError(f"Value for {BallData.properties[roi]} is <= 0 or >= 90")
-            if roi == BallMetrics.TOTAL_SPIN and result <= 100:
-                raise ValueError(f"Value for {BallData.properties[roi]} is <= 100")
-            # For some reason ball speed sometimes get an extra digit added
-            if roi == BallMetrics.SPEED and result > 200:
-                result = self.__fix_out_of_bounds_metric(200, result, roi)
-                self.corrections[roi] = True
-            elif roi == BallMetrics.TOTAL_SPIN and result > 13000:
-                result = self.__fix_out_of_bounds_metric(13000, result, roi)
-                self.corrections[roi] = True
-            elif roi == BallMetrics.CLUB_SPEED and result > 140:
-                result = self.__fix_out_of_bounds_metric(140, result, roi)
-                self.corrections[roi] = True
-            # Round to one decimal place
-            if roi == BallMetrics.SPIN_AXIS and self.launch_monitor == LaunchMonitor.TRUGOLF_APOGEE:
-                logging.debug(f'Setting side spin for TruGolf Apogee using the spin axis ROI value: {math.floor(result*10)/10}')
-                setattr(self, BallMetrics.SIDE_SPIN, math.floor(result*10)/10)
-            elif roi == BallMetrics.SPIN_AXIS and self.launch_monitor == LaunchMonitor.TRUGOLF_APOGEE_AID:
-                side_spin = math.floor(result * 10) / 10
-                reversed_side_spin = -(side_spin)
-                logging.debug(
-                    f'Reversing side spin for TruGolf Apogee AID using the spin axis ROI value: {side_spin} converted to: {reversed_side_spin}')
-                setattr(self, BallMetrics.SIDE_SPIN, reversed_side_spin)
-            else:
-                setattr(self, roi, math.floor(result*10)/10)
-            logging.debug(f'Cleaned and corrected value: {result}')
-        except ValueError as e:
-            msg = f'{format(e)}'
-        except:
-            msg = f"Could not convert value {result} for '{BallData.properties[roi]}' to float 0"
-        finally:
-            if not msg is None:
-                logging.debug(msg)
-                self.errors[roi] = msg
-                setattr(self, roi, BallData.invalid_value)
-
     def eq(self, other):
         diff_count = 0
         non_zero_found = False
@@ -438,7 +360,8 @@ class BallData:
             self.new_shot = True
         return diff_count
 
-    def __fix_out_of_bounds_metric(self, limit, value, roi):
+    @staticmethod
+    def fix_out_of_bounds_metric(limit, value, roi):
         msg = f"Invalid {BallData.properties[roi]} value: {value} > {limit}"
         corrected_value = value
         while corrected_value > limit:
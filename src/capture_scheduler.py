@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class CaptureScheduler:
+    """
+    Decides when the next screenshot is due.
+
+    Screenshots are taken every burst_ms for burst_duration_ms after activity, a screen
+    change or a club being selected in GSPro, every interval_ms after that, and every
+    idle_ms once nothing has happened for idle_after_ms. Deadlines are fixed from the
+    previous deadline rather than from when the screenshot finished, so time spent
+    capturing doesn't make the screenshots drift. How late each tick is, and deadlines
+    missed because a screenshot took longer than the interval, are recorded.
+
+    activity() is called from other threads, e.g. the GUI thread when a club is
+    selected, so it wakes a thread blocked in wait() to take the screenshot sooner.
+    """
+
+    burst_ms = 40
+    burst_duration_ms = 5000
+    idle_ms = 1000
+    idle_after_ms = 120000
+
+    def __init__(self, interval_ms=250, history=500):
+        self.interval_ms = interval_ms
+        self.ticks = 0
+        self.missed = 0
+        self.jitter = deque(maxlen=history)
+        self.mode = None
+        now = time.perf_counter()
+        self.last_activity = now
+        self.last_tick = now
+        self.deadline = now
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+
+    def activity(self):
+        with self.__lock:
+            now = time.perf_counter()
+            self.last_activity = now
+            # Don't wait out an idle interval before speeding up
+            self.deadline = min(self.deadline, self.last_tick + CaptureScheduler.burst_ms / 1000)
+        self.__wake.set()
+
+    def wake(self):
+        """Wake a thread blocked in wait(), e.g. so it can see it was shut down."""
+        self.__wake.set()
+
+    def wait(self, stop):
+        """
+        Wait until the next screenshot is due, activity() bringing the deadline forward ends
+        the wait early. Returns straight away when the stop event is set.
+        """
+        while not stop.is_set():
+            # Cleared before reading the deadline so a change to it after this isn't missed
+            self.__wake.clear()
+            remaining = self.time_to_next()
+            if remaining <= 0:
+                break
+            self.__wake.wait(remaining)
+
+    def restart(self):
+        """Start again from now, e.g. after being paused, without counting the time as missed deadlines."""
+        with self.__lock:
+            self.deadline = time.perf_counter()
+        self.activity()
+
+    def interval(self, now=None):
+        """Seconds between screenshots at the moment."""
+        now = now if now is not None else time.perf_counter()
+        quiet_ms = (now - self.last_activity) * 1000
+        if quiet_ms < CaptureScheduler.burst_duration_ms:
+            mode, interval_ms = 'burst', CaptureScheduler.burst_ms
+        elif quiet_ms >= CaptureScheduler.idle_after_ms:
+            mode, interval_ms = 'idle', CaptureScheduler.idle_ms
+        else:
+            mode, interval_ms = 'normal', self.interval_ms
+        if mode != self.mode:
+            logging.debug(f'{self.__class__.__name__} screenshots every {interval_ms}ms ({mode}), {self.stats()}')
+            self.mode = mode
+        return interval_ms / 1000
+
+    def time_to_next(self):
+        """Seconds until the next screenshot is due, 0 if it is already due."""
+        return max(self.deadline - time.perf_counter(), 0)
+
+    def tick(self):
+        """Call when a screenshot is about to be taken, schedules the next one."""
+        with self.__lock:
+            now = time.perf_counter()
+            self.ticks = self.ticks + 1
+            self.jitter.append((now - self.deadline) * 1000)
+            self.last_tick = now
+            interval = self.interval(now)
+            self.deadline = self.deadline + interval
+            if self.deadline < now:
+                # Screenshots are taking longer than the interval, skip the ticks already missed
+                missed = int((now - self.deadline) / interval) + 1
+                self.missed = self.missed + missed
+                self.deadline = self.deadline + missed * interval
+
+    def stats(self):
+        jitter = list(self.jitter)
+        return {
+            'ticks': self.ticks,
+            'missed': self.missed,
+            'jitter_ms_p50': round(float(np.percentile(jitter, 50)), 3) if len(jitter) > 0 else None,
+            'jitter_ms_p95': round(float(np.percentile(jitter, 95)), 3) if len(jitter) > 0 else None,
+            'jitter_ms_max': round(max(jitter), 3) if len(jitter) > 0 else None
+        }
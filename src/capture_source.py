@@ -0,0 +1,160 @@
+import logging
+import os
+import cv2
+import numpy as np
+from src.custom_exception import CaptureSourceFinished
+
+
+class FrameClock:
+    """
+    Deterministic clock for replayed captures, time only moves forward one
+    screenshot interval per captured frame so replays don't depend on how
+    fast the machine running them is.
+    """
+
+    def __init__(self, interval_ms=250, start_ms=0):
+        self.interval_ms = interval_ms
+        self.start_ms = start_ms
+        self.tick = 0
+
+    def now_ms(self):
+        return self.start_ms + self.tick * self.interval_ms
+
+    def advance(self):
+        self.tick = self.tick + 1
+
+    def reset(self):
+        self.tick = 0
+
+
+class CaptureSource:
+    """
+    Where screenshots come from. Implementations return BGR uint8 frames
+    the same as a screen capture of the mirror app window.
+    """
+    # Whether the source is a window that can be resized to the saved dimensions
+    resizable = False
+
+    def __init__(self):
+        self.name = None
+        # (width, height) of the whole frame the last capture was cut from
+        self.captured_size = None
+
+    def open(self, name):
+        self.name = name
+
+    def size(self):
+        return {'w': 0, 'h': 0}
+
+    def rect(self):
+        size = self.size()
+        return {'left': 0, 'top': 0, 'right': size['w'], 'bottom': size['h']}
+
+    def resize(self, width: int, height: int):
+        return
+
+    def frame(self) -> np.ndarray:
+        raise NotImplementedError()
+
+    def capture(self, region, copy=True):
+        """
+        Capture the (left, top, right, bottom) region of the next frame, the whole frame if region is None.
+        Returns the image and the (left, top) offset of the image in the frame.
+        """
+        frame = self.frame()
+        h, w = frame.shape[:2]
+        self.captured_size = (w, h)
+        left, top, right, bottom = 0, 0, w, h
+        if region is not None:
+            left, top = min(max(region[0], 0), w), min(max(region[1], 0), h)
+            right, bottom = min(max(region[2], left), w), min(max(region[3], top), h)
+            if right <= left or bottom <= top:
+                left, top, right, bottom = 0, 0, w, h
+        image = frame[top:bottom, left:right]
+        if copy:
+            image = image.copy()
+        return image, (left, top)
+
+    def close(self):
+        return
+
+
+class ImageDirectoryCaptureSource(CaptureSource):
+    """
+    Replays the image files in a directory in file name order, one image per screenshot interval.
+    """
+
+    extensions = ('.png', '.bmp', '.jpg', '.jpeg')
+
+    def __init__(self, path, clock: FrameClock = None, loop=False):
+        super().__init__()
+        self.path = path
+        self.clock = clock if clock is not None else FrameClock()
+        self.loop = loop
+        self.files = sorted(
+            os.path.join(path, file) for file in os.listdir(path) if file.lower().endswith(ImageDirectoryCaptureSource.extensions))
+        if len(self.files) <= 0:
+            raise FileNotFoundError(f"No images found in '{path}'")
+        self.index = 0
+        self.current_file = None
+        self.current_frame = cv2.imread(self.files[0], cv2.IMREAD_COLOR)
+
+    def size(self):
+        h, w = self.current_frame.shape[:2]
+        return {'w': w, 'h': h}
+
+    def frame(self) -> np.ndarray:
+        if self.index >= len(self.files):
+            if not self.loop:
+                raise CaptureSourceFinished(f"All {len(self.files)} images in '{self.path}' have been replayed")
+            self.index = 0
+        self.current_file = self.files[self.index]
+        self.current_frame = cv2.imread(self.current_file, cv2.IMREAD_COLOR)
+        if self.current_frame is None:
+            raise ValueError(f"Could not read image '{self.current_file}'")
+        self.index = self.index + 1
+        self.clock.advance()
+        return self.current_frame
+
+
+class VideoFileCaptureSource(CaptureSource):
+    """
+    Replays a recording of the mirror app window. Frames are picked using the frame clock
+    so a 30fps recording replayed with a 250ms screenshot interval returns every 7.5th frame
+    whatever the speed of the machine.
+    """
+
+    def __init__(self, path, clock: FrameClock = None):
+        super().__init__()
+        self.path = path
+        self.clock = clock if clock is not None else FrameClock()
+        self.video = cv2.VideoCapture(path)
+        if not self.video.isOpened():
+            raise FileNotFoundError(f"Could not open video '{path}'")
+        self.fps = self.video.get(cv2.CAP_PROP_FPS) or 30
+        self.frame_index = -1
+        self.current_frame = None
+        logging.debug(f'{self.__class__.__name__} replaying {path} at {self.fps} fps')
+
+    def size(self):
+        return {
+            'w': int(self.video.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'h': int(self.video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        }
+
+    def frame(self) -> np.ndarray:
+        wanted_index = int(self.clock.now_ms() * self.fps / 1000)
+        while self.frame_index < wanted_index:
+            ok = self.video.grab()
+            if not ok:
+                raise CaptureSourceFinished(f"End of video '{self.path}'")
+            self.frame_index = self.frame_index + 1
+        ok, frame = self.video.retrieve()
+        if not ok:
+            raise CaptureSourceFinished(f"End of video '{self.path}'")
+        self.current_frame = frame
+        self.clock.advance()
+        return self.current_frame
+
+    def close(self):
+        self.video.release()
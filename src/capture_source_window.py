@@ -0,0 +1,56 @@
+from src.capture_source import CaptureSource
+from src.ctype_screenshot import ScreenMirrorWindow, ScreenshotOfWindow
+
+
+class WindowCaptureSource(CaptureSource):
+    """
+    Captures the client area of a mirror app window using Win32.
+    """
+    resizable = True
+
+    def __init__(self):
+        super().__init__()
+        self.mirror_window = None
+        self.screenshot_of_window = None
+
+    def open(self, name):
+        # Check if window minimized, for some reason it has a different hwnd when minimized
+        # so check here first and restore
+        if self.mirror_window and self.mirror_window.is_minimized():
+            # Restore the window
+            self.mirror_window.restore()
+        # Find the window using window title in case a new one was started
+        hwnd = ScreenMirrorWindow.find_window(name)
+        if self.mirror_window is None or hwnd != self.mirror_window.hwnd:
+            self.mirror_window = ScreenMirrorWindow(name)
+            self.screenshot_of_window = ScreenshotOfWindow(
+                hwnd=self.mirror_window.hwnd,
+                client=True,
+                ascontiguousarray=True)
+        self.name = name
+
+    def is_minimized(self):
+        return self.mirror_window.is_minimized()
+
+    def restore(self):
+        self.mirror_window.restore()
+
+    def size(self):
+        return self.mirror_window.size()
+
+    def rect(self):
+        return {
+            'left': self.mirror_window.rect.left,
+            'top': self.mirror_window.rect.top,
+            'right': self.mirror_window.rect.right,
+            'bottom': self.mirror_window.rect.bottom
+        }
+
+    def resize(self, width: int, height: int):
+        self.mirror_window.resize(width, height)
+
+    def capture(self, region, copy=True):
+        image, offset = self.screenshot_of_window.screenshot_region(region, copy=copy)
+        # The client area, size() is the whole window including its border and title bar
+        self.captured_size = self.screenshot_of_window.captured_size
+        return image, offset
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Detects a changed screenshot using the 'Mean Squared Error' between two frames.
+
+    The error is the sum of the squared channel differences per pixel, the same value the
+    original float64 full frame calculation returned, so existing thresholds still apply.
+    To keep the cost low only every step'th pixel in each direction is sampled, the
+    difference is calculated in int16 and summed straight into an int64 without creating
+    frame sized float temporaries, and the difference buffer is reused between calls.
+    If a region is set only the pixels inside it are compared.
+
+    When only a region, or a capture of part of the frame, is compared the error is still
+    divided by the number of pixels in the whole frame, as if the pixels outside were
+    unchanged, so the per launch monitor mse_min thresholds mean the same whatever size
+    the ROI's are.
+    """
+
+    def __init__(self, step=2):
+        self.step = step
+        self.region = None
+        self.frame_size = None
+        self.__diff = None
+
+    def set_region(self, region, frame_size=None):
+        # region is (left, top, right, bottom) or None for the full frame, frame_size is the
+        # (width, height) of the whole frame if the images compared are only part of it
+        if region is not None:
+            left, top, right, bottom = region
+            region = (max(left, 0), max(top, 0), max(right, 0), max(bottom, 0))
+        self.region = region
+        self.frame_size = frame_size
+
+    def __area(self, image):
+        if self.region is not None:
+            left, top, right, bottom = self.region
+            area = image[top:bottom, left:right]
+            if area.size > 0:
+                return area
+        return image
+
+    def __frame_scale(self, area):
+        # Fraction of the whole frame compared
+        pixels = area.shape[0] * area.shape[1]
+        if self.frame_size is None or self.frame_size[0] * self.frame_size[1] < pixels:
+            return 1.0
+        return pixels / (self.frame_size[0] * self.frame_size[1])
+
+    def mse(self, imageA, imageB):
+        # NOTE: the two images must have the same dimension
+        if imageA.shape != imageB.shape:
+            raise ValueError(f'Image dimensions differ: {imageA.shape} {imageB.shape}')
+        areaA = self.__area(imageA)
+        sampleA = areaA[::self.step, ::self.step]
+        sampleB = self.__area(imageB)[::self.step, ::self.step]
+        # Difference buffer is reused while the sampled shape stays the same
+        if self.__diff is None or self.__diff.shape != sampleA.shape:
+            self.__diff = np.empty(sampleA.shape, dtype=np.int16)
+        diff = np.subtract(sampleA, sampleB, out=self.__diff, dtype=np.int16).ravel()
+        err = np.einsum('i,i->', diff, diff, dtype=np.int64)
+        return float(err) / float(sampleA.shape[0] * sampleA.shape[1]) * self.__frame_scale(areaA)
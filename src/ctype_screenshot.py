@@ -329,6 +329,8 @@ class ScreenshotOfWindow:
         self.old_width = -1
         self.old_height = -1
         self.old_left, self.old_right, self.old_top, self.old_bottom = -1, -1, -1, -1
+        # (width, height) of the area captured last, the client area if client is set
+        self.captured_size = None
 
     def __enter__(self):
         return self
@@ -400,7 +402,7 @@ class ScreenshotOfWindow:
         )
         return left, right, top, bottom, w, h, values_are_the_same, h * w * 4
 
-    def screenshot_window(self) -> np.ndarray:
+    def __capture(self) -> np.ndarray:
         if self.client:
             GetClientRect(self.hwnd, self.rect_ref)
         else:
@@ -447,15 +449,43 @@ class ScreenshotOfWindow:
             self.old_height,
         ) = (left, right, top, bottom, w, h)
 
-        # Prepare the image byte data
-        imagex = bytearray(h * w * 3)
-        imagex[0::3], imagex[1::3], imagex[2::3] = self.imagex[2::4], self.imagex[1::4], self.imagex[0::4]
+        # View of the captured BGRA bytes, no copy
+        return np.frombuffer(self.imagex, dtype=np.uint8, count=h * w * 4).reshape((h, w, 4))
+
+    def screenshot_window(self) -> np.ndarray:
+        screenshot_array, offset = self.screenshot_region(None)
+        return screenshot_array
+
+    def screenshot_region(self, region, copy=True):
+        """Capture only the (left, top, right, bottom) region of the window, the full window if region is None.
 
-        # Convert to numpy array and check for empty array
-        screenshot_array = np.frombuffer(bytes(imagex), dtype=np.uint8).reshape((h, w, 3))[..., ::-1].copy()
+        Args:
+            region (tuple): The (left, top, right, bottom) region to capture or None for the whole window.
+            copy (bool, optional): Whether to return a copy, if False a view of the capture buffer is
+                returned that is only valid until the next capture. Defaults to True.
+
+        Returns:
+            tuple: The screenshot image as a NumPy array and the (left, top) offset of the image in the window.
+
+        """
+        bgra = self.__capture()
+        h, w = bgra.shape[:2]
+        self.captured_size = (w, h)
+        left, top, right, bottom = 0, 0, w, h
+        if region is not None:
+            left, top = min(max(region[0], 0), w), min(max(region[1], 0), h)
+            right, bottom = min(max(region[2], left), w), min(max(region[3], top), h)
+            if right <= left or bottom <= top:
+                # Region outside the window, capture everything
+                left, top, right, bottom = 0, 0, w, h
+
+        # Drop the alpha channel to get the BGR image, only the requested pixels are copied
+        screenshot_array = bgra[top:bottom, left:right, :3]
+        if copy:
+            screenshot_array = screenshot_array.copy()
 
         if screenshot_array.size == 0:
             logging.debug("Captured screenshot is empty, array size is zero.")
             raise ValueError("Captured screenshot is empty, array size is zero.")
 
-        return screenshot_array
+        return screenshot_array, (left, top)
@@ -21,5 +21,13 @@ class GSProConnectionGSProClosedConnection(Exception):
     pass
 
 
+class GSProSendQueueFull(Exception):
+    pass
+
+
 class PutterNotSelected(Exception):
     pass
+
+
+class CaptureSourceFinished(Exception):
+    pass
@@ -5,6 +5,7 @@ from src.SelectDeviceForm import SelectDeviceForm
 from src.custom_exception import WindowNotFoundException
 from src.device_base import DeviceBase
 from src.log_message import LogMessageTypes, LogMessageSystems
+from src.launch_monitor_profile import LaunchMonitorProfiles
 from src.settings import LaunchMonitor
 from src.worker_screenshot_device_launch_monitor import WorkerScreenshotDeviceLaunchMonitor
 
@@ -94,31 +95,7 @@ class DeviceLaunchMonitorScreenshot(DeviceBase):
                 f"QLabel {{ background-color : white; color : white; }}")
 
     def __display_training_file(self):
-        train_file = 'train'
-        if self.main_window.settings.device_id == LaunchMonitor.MEVOPLUS:
-            train_file = 'mevo'
-        elif self.main_window.settings.device_id == LaunchMonitor.FSKIT:
-            train_file = 'fskit'
-        elif self.main_window.settings.device_id == LaunchMonitor.TRACKMAN:
-            train_file = 'trackman'
-        elif self.main_window.settings.device_id == LaunchMonitor.TRUGOLF_APOGEE:
-            train_file = 'apex'
-        elif self.main_window.settings.device_id == LaunchMonitor.TRUGOLF_APOGEE_AID:
-            train_file = 'apex_aid'
-        elif self.main_window.settings.device_id == LaunchMonitor.UNEEKOR:
-            train_file = 'uneekor'
-        elif self.main_window.settings.device_id == LaunchMonitor.UNEEKOR_IPAD:
-            train_file = 'uneekor_ipad'
-        elif self.main_window.settings.device_id == LaunchMonitor.SKYTRAKPLUS:
-            train_file = 'skytrak'
-        elif self.main_window.settings.device_id == LaunchMonitor.R50:
-            train_file = 'r50'
-        elif self.main_window.settings.device_id == LaunchMonitor.XSWINGPRO:
-            train_file = 'xswingpro'
-        elif self.main_window.settings.device_id == LaunchMonitor.SQUARE:
-            train_file = 'square'
-        elif self.main_window.settings.device_id == LaunchMonitor.SC4:
-            train_file = 'voicecaddiesc4'
+        train_file = LaunchMonitorProfiles.get(self.main_window.settings.device_id).train_file
         self.main_window.ocr_training_file_label.setText(f"OCR File: {train_file}")
         self.main_window.ocr_training_file_label.setStyleSheet(f"QLabel {{ background-color : blue; color : white; }}")
         self.update_mevo_mode()
@@ -0,0 +1,134 @@
+import logging
+import os
+from dataclasses import dataclass
+import cv2
+from src.ball_data import BallData
+from src.launch_monitor_profile import LaunchMonitorProfile, ocr_patterns
+from src.ocr_cache import OcrCache
+from src.ocr_preprocess import grey_scale, threshold_crop
+from src.roi_extractor import RoiExtractor
+from src.shot_data_parser import ShotDataParser
+from src.template_recognizer import TemplateRecognizer
+from src.tesserocr_pool import TesserocrPool, TesserocrThreadPool, recognise
+
+
+@dataclass
+class FrameReaderOptions:
+    """The settings used to read a frame, small enough to send to an OCR process with every frame."""
+    launch_monitor: str = None
+    colour_threshold: int = 180
+    zoom_images: str = 'No'
+    create_debug_images: str = 'No'
+    parallel_ocr: str = 'No'
+    offline_mode: str = 'No'
+
+    @staticmethod
+    def from_settings(settings):
+        mevo_plus = getattr(settings, 'mevo_plus', {})
+        return FrameReaderOptions(
+            launch_monitor=getattr(settings, 'device_id', None),
+            colour_threshold=getattr(settings, 'colour_threshold', 180),
+            zoom_images=getattr(settings, 'zoom_images', 'No'),
+            create_debug_images=getattr(settings, 'create_debug_images', 'No'),
+            parallel_ocr=getattr(settings, 'parallel_ocr', 'No'),
+            offline_mode=mevo_plus.get('offline_mode', 'No'))
+
+
+def text_polarity(profile: LaunchMonitorProfile):
+    """dark_text for TemplateRecognizer, threshold_crop leaves black text on white, otherwise it isn't known."""
+    return True if profile.threshold else None
+
+
+class FrameReader:
+    """
+    Reads the metrics shown in a frame, cuts the ROI's out of it, prepares them for
+    OCR, OCR's them and parses the text into a BallData. Holds the tesseract engines
+    so a reader is only used by one thread, or one OCR process, at a time.
+
+    Profiles with glyph_templates read each ROI with the TemplateRecognizer first,
+    only the ROI's it can't read confidently are OCR'd by tesseract.
+    """
+
+    def __init__(self, path='.\\'):
+        self.tesserocr_pool = TesserocrPool(path)
+        self.tesserocr_thread_pool = TesserocrThreadPool(path=path)
+        self.roi_extractor = RoiExtractor()
+        self.ocr_cache = OcrCache()
+        self.template_recognizer = TemplateRecognizer(path)
+        self.shot_data_parser = None
+
+    def read(self, image, offset, rois, profile: LaunchMonitorProfile, options: FrameReaderOptions,
+             selected_club, timing, previous_balldata=None):
+        balldata = BallData()
+        balldata.timing = timing
+        balldata.club = selected_club
+        if not profile.putting:
+            balldata.launch_monitor = options.launch_monitor
+            if self.shot_data_parser is None or self.shot_data_parser.profile is not profile:
+                self.shot_data_parser = ShotDataParser(profile)
+
+        images = self.preprocess(image, offset, rois, profile, options)
+        timing.mark('preprocess')
+        ocr_results = self.recognise(images, profile, options, timing)
+        timing.mark('ocr')
+        # Process results in ROI order so the output is the same whichever way the OCR was done
+        for roi in images:
+            ocr_result, conf = ocr_results[roi]
+            if profile.putting:
+                balldata.process_putt_data(ocr_result, roi, previous_balldata)
+            else:
+                self.shot_data_parser.parse(balldata, ocr_result, roi, selected_club, options.offline_mode)
+        return balldata
+
+    def preprocess(self, image, offset, rois, profile: LaunchMonitorProfile, options: FrameReaderOptions):
+        """Cut the profile's ROI's out of image and prepare them for OCR, returns the grey scale images by ROI."""
+        images = {}
+        for roi in profile.rois:
+            cropped_img = self.roi_extractor.extract(roi, rois[roi], image, offset)
+            if profile.zoom and options.zoom_images == "Yes":
+                logging.debug(f'ocr {roi} - zoom image')
+                original_height, original_width = cropped_img.shape[:2]
+                cropped_img = cv2.resize(cropped_img,
+                                           (int(original_height * 6), int(original_width * 2)),
+                                           interpolation=cv2.INTER_LINEAR)
+            img = grey_scale(cropped_img)
+            if profile.threshold:
+                # Convert to black text on white background, remove background
+                threshold = options.colour_threshold
+                logging.debug(f'ocr {roi} - using threshold: {threshold}')
+                img, bbox = threshold_crop(img, threshold)
+                if bbox is not None:
+                    logging.debug(f'ocr {roi} - bounding box with a small amount of white space added: {bbox}')
+                if options.create_debug_images == 'Yes':
+                    filename = f"{roi}.bmp"
+                    path = f"{os.getcwd()}\\appdata\\logs\\{filename}"
+                    cv2.imwrite(path, img)
+            images[roi] = img
+        return images
+
+    def recognise(self, images, profile: LaunchMonitorProfile, options: FrameReaderOptions, timing=None):
+        """OCR the prepared ROI images, returns the text and confidence by ROI."""
+        train_file = profile.train_file
+        ocr_results = {}
+        if profile.glyph_templates and self.template_recognizer.use(train_file):
+            for roi in images:
+                result = self.template_recognizer.recognise(images[roi], roi, timing, text_polarity(profile))
+                if result is not None:
+                    ocr_results[roi] = result
+            images = {roi: images[roi] for roi in images if roi not in ocr_results}
+            if len(images) <= 0:
+                return ocr_results
+        logging.debug(f"Using {train_file}.traineddata for OCR")
+        patterns = ocr_patterns(profile.constraints)
+        if options.parallel_ocr == 'Yes':
+            self.tesserocr_thread_pool.use(train_file, patterns)
+            ocr_results.update(self.tesserocr_thread_pool.recognise(images, timing, self.ocr_cache, profile.constraints))
+        else:
+            self.tesserocr_pool.use(train_file, patterns)
+            for roi in images:
+                ocr_results[roi] = recognise(self.tesserocr_pool, images[roi], roi, timing, self.ocr_cache, profile.constraints.get(roi))
+        return ocr_results
+
+    def end(self):
+        self.tesserocr_pool.end()
+        self.tesserocr_thread_pool.end()
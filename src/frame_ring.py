@@ -0,0 +1,68 @@
+import logging
+import numpy as np
+
+
+class FrameRing:
+    """
+    A fixed number of preallocated uint8 frame buffers reused for every screenshot.
+
+    Buffers are (re)allocated only when the frame shape changes, e.g. the mirror window
+    or the captured ROI region is resized. A slot is handed out with acquire(), consumers
+    get read only views with view() and must give them back with release(), a slot is
+    only reused once nothing holds it.
+    """
+
+    def __init__(self, size=3):
+        self.size = size
+        self.shape = None
+        self.allocations = 0
+        self.bytes_allocated = 0
+        self.__buffers = []
+        self.__references = [0] * size
+        self.__next = 0
+
+    def __allocate(self, shape):
+        # Views of the old buffers still held by consumers stay valid, they are just no longer reused
+        self.__buffers = [np.empty(shape, dtype=np.uint8) for i in range(self.size)]
+        self.__references = [0] * self.size
+        self.__next = 0
+        self.shape = shape
+        self.allocations = self.allocations + self.size
+        self.bytes_allocated = self.bytes_allocated + self.size * self.__buffers[0].nbytes
+        logging.debug(f'{self.__class__.__name__} allocated {self.size} frame buffers of shape {shape}')
+
+    def acquire(self, shape):
+        """Return the index of a free writable buffer of the specified shape."""
+        if shape != self.shape:
+            self.__allocate(shape)
+        for i in range(self.size):
+            index = (self.__next + i) % self.size
+            if self.__references[index] <= 0:
+                self.__references[index] = 1
+                self.__next = (index + 1) % self.size
+                return index
+        raise RuntimeError(f'{self.__class__.__name__} no free frame buffers, all {self.size} are in use')
+
+    def buffer(self, index):
+        return self.__buffers[index]
+
+    def view(self, index, retain=True):
+        """
+        Read only view of a buffer, the caller must release it when finished. With retain
+        False the view holds the reference acquire() took instead of taking another one.
+        """
+        if retain:
+            self.retain(index)
+        view = self.__buffers[index].view()
+        view.flags.writeable = False
+        return view
+
+    def retain(self, index):
+        self.__references[index] = self.__references[index] + 1
+
+    def release(self, index):
+        if index is not None and self.__references[index] > 0:
+            self.__references[index] = self.__references[index] - 1
+
+    def in_use(self):
+        return sum(1 for references in self.__references if references > 0)
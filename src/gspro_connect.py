@@ -1,91 +1,303 @@
+import queue
 import socket
 import logging
-import json
-from threading import Event
+import threading
+import time
+from concurrent.futures import CancelledError, TimeoutError
 
 import select
-from PySide6.QtCore import QObject
+from PySide6.QtCore import QObject, Signal
 
 from src.ball_data import BallData
 from src.custom_exception import GSProConnectionTimeout, GSProConnectionUknownError, \
     GSProConnectionGSProClosedConnection, GSProConnectionSocketError
+from src.gspro_send_queue import GSProSendQueue, GSProSendRequest
+from src.json_stream import JSONStreamDecoder
+from src.shot_journal import ShotJournalState
 
 
 class GSProConnect(QObject):
+    """
+    Connection to the GSPro Open API.
+
+    Messages are sent by a writer thread from a bounded send queue so nothing waits
+    on GSPro's round trip to queue the next shot. A reader thread matches responses
+    to the message sent, anything else GSPro sends is returned by next_message().
+
+    With auto_reconnect set a lost connection isn't reported, instead it is reopened in
+    the background with an increasing delay between attempts. Shots made meanwhile stay
+    in the send queue, however many there are, along with any sent that GSPro hadn't
+    responded to, and are sent in order once reconnected.
+
+    Shots are recorded in the journal, if there is one, when they are queued, sent and
+    when GSPro responds.
+    """
 
     successful_send = 200
+    player_info = 201
+    # Seconds to wait for GSPro to respond to a message
+    response_timeout = 2
+    # Seconds between reconnect attempts, doubled after each failed attempt
+    reconnect_delay = 0.5
+    reconnect_max_delay = 30
+    # TCP keepalive, seconds idle before the first probe and between probes
+    keepalive_idle = 10
+    keepalive_interval = 1
+    keepalive_count = 5
 
-    def __init__(self, device_id, units, api_version) -> None:
+    # Reconnect attempt number and the seconds until it is made
+    reconnecting = Signal(int, float)
+    reconnected = Signal()
+
+    def __init__(self, device_id, units, api_version, auto_reconnect=False, journal=None) -> None:
         self._socket = None
+        self.journal = journal
+        self._address = None
+        self.auto_reconnect = auto_reconnect
+        self._stop = threading.Event()
         self._device_id = device_id
         self._units = units
         self._api_version = api_version
         self._shot_number = 1
         self._connected = False
+        self._failed = False
+        # Guards the connection failing, from the reader and writer threads at the same time
+        self._lock = threading.Lock()
+        self._error = None
+        self._messages = queue.Queue()
+        self._decoder = JSONStreamDecoder()
+        self.send_queue = GSProSendQueue()
         super(GSProConnect, self).__init__()
 
     def init_socket(self, ip_address: str, port: int) -> None:
-        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self._socket.connect((ip_address, port))
-        self._socket.settimeout(2)
-        self._connected = True
+        self._address = (ip_address, port)
+        self._stop.clear()
+        sock = self.__open_socket()
+        self._error = None
+        self._messages = queue.Queue()
+        self.send_queue.open()
+        self.__start(sock)
+
+    def __open_socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.connect(self._address)
+            sock.settimeout(2)
+            GSProConnect.__keepalive(sock)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def __keepalive(sock):
+        # Detect a connection that has silently gone away, e.g. GSPro's PC going to sleep
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'SIO_KEEPALIVE_VALS'):
+            # Windows, times in ms
+            sock.ioctl(socket.SIO_KEEPALIVE_VALS,
+                       (1, GSProConnect.keepalive_idle * 1000, GSProConnect.keepalive_interval * 1000))
+        elif hasattr(socket, 'TCP_KEEPIDLE'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, GSProConnect.keepalive_idle)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, GSProConnect.keepalive_interval)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, GSProConnect.keepalive_count)
+
+    def __start(self, sock):
+        self._decoder.reset()
+        with self._lock:
+            self._socket = sock
+            self._failed = False
+            self._connected = True
+        threading.Thread(target=self.__write, args=(sock,), name='gspro-writer', daemon=True).start()
+        threading.Thread(target=self.__read, args=(sock,), name='gspro-reader', daemon=True).start()
 
     def connected(self):
         return self._connected
 
+    def __active(self, sock):
+        # Threads stop when the connection fails or the socket is replaced
+        return self._connected and not self._failed and self._socket is sock
+
+    def send(self, payload: bytes, attempts=2):
+        """Queue a message for GSPro, returns a future for GSPro's response."""
+        return self.send_queue.put(GSProSendRequest(payload=payload, attempts=attempts))
+
     def send_msg(self, payload, attempts=2):
+        # Waits for GSPro's response
         if self._connected:
-            for attempt in range(attempts):
-                try:
-                    logging.info(f"Sending to GSPro data: {payload}")
-                    self._socket.sendall(payload)
-                    msg = self._socket.recv(2048)
-                except socket.timeout:
-                    logging.info('Timed out. Retrying...')
-                    if attempt >= attempts-1:
-                        raise GSProConnectionTimeout(f'Failed to send shot to GSPro after {attempts} attempts.')
-                    Event().wait(0.5)
-                    continue
-                except socket.error as e:
-                    msg = f'GSPro Connector socket error when trying to send shot, Exception: {format(e)}'
-                    logging.debug(msg)
-                    raise GSProConnectionSocketError(msg)
-                except Exception as e:
-                    msg = f"GSPro Connector unknown error when trying to send shot, Exception: {format(e)}"
-                    logging.debug(msg)
-                    raise GSProConnectionUknownError(msg)
-                else:
-                    if len(msg) == 0:
-                        msg = f"GSPro closed the connection"
-                        logging.debug(msg)
-                        raise GSProConnectionGSProClosedConnection(msg)
-                    else:
-                        logging.debug(f"Response from GSPro: {msg}")
-                        return msg
-
-    def launch_ball(self, ball_data: BallData) -> None:
-        if self._connected:
-            device = {
-                "DeviceID": self._device_id,
-                "Units": self._units,
-                "ShotNumber": self._shot_number,
-                "APIversion": self._api_version
-            }
-            payload = device | ball_data.to_gspro()
-            logging.debug(f'Launch Ball payload: {payload} ball_data.to_gspro(): {ball_data.to_gspro()}')
-            self.send_msg(json.dumps(payload).encode("utf-8"))
-            self._shot_number += 1
-
-    def check_for_message(self):
-        message = bytes(0)
+            future = self.send(payload, attempts)
+            try:
+                return future.result(timeout=attempts * (GSProConnect.response_timeout + 1))
+            except TimeoutError:
+                raise GSProConnectionTimeout(f'Failed to send shot to GSPro after {attempts} attempts.')
+            except CancelledError:
+                raise GSProConnectionUknownError('Shot was not sent to GSPro, the connection was closed')
+
+    def launch_ball(self, ball_data: BallData, attempts=2, journal_id=None):
+        """
+        Queue a shot for GSPro, returns a future for GSPro's response or None if not connected.
+        journal_id is the shot's id in the journal when resending a journaled shot.
+        """
         if self._connected:
-            read_socket, write_socket, error_socket = select.select([self._socket], [], [], 0)
-            while read_socket:
-                message = message + self._socket.recv(1024)
-                read_socket, write_socket, error_socket = select.select([self._socket], [], [], 0)
-        return message
+            request = GSProSendRequest(ball_data=ball_data, attempts=attempts, journal_id=journal_id)
+            if self.journal is not None:
+                if request.journal_id is None:
+                    request.journal_id = self.journal.produced(ball_data)
+                request.future.add_done_callback(lambda future: self.__journal_result(request.journal_id, future))
+            return self.send_queue.put(request)
+        return None
+
+    def __journal_result(self, journal_id, future):
+        if future.cancelled():
+            self.journal.record(journal_id, ShotJournalState.CANCELLED)
+        elif future.exception() is not None:
+            self.journal.record(journal_id, ShotJournalState.FAILED, error=format(future.exception()))
+        else:
+            self.journal.record(journal_id, ShotJournalState.ACKED, response=future.result().decode('utf-8'))
+
+    def queue_stats(self):
+        return self.send_queue.stats()
+
+    def __payload(self, ball_data: BallData):
+        payload = ball_data.to_gspro_payload(self._device_id, self._units, self._shot_number, self._api_version)
+        self._shot_number += 1
+        return payload
+
+    def __write(self, sock):
+        while self.__active(sock):
+            # A failed connection's writer must not take the requests replayed after reconnecting
+            request = self.send_queue.get(timeout=0.5, active=lambda: self.__active(sock))
+            if request is None:
+                continue
+            try:
+                if request.timing is not None:
+                    request.timing.mark('queue')
+                if request.payload is None:
+                    request.shot_number = self._shot_number
+                    request.payload = self.__payload(request.ball_data)
+                logging.info(f"Sending to GSPro data: {request.payload}")
+                request.deadline = time.monotonic() + GSProConnect.response_timeout
+                if self.journal is not None and request.journal_id is not None:
+                    # Before sending so it can't be journaled after the response
+                    self.journal.record(request.journal_id, ShotJournalState.SENT,
+                                        shot_number=request.shot_number, attempt=request.attempt)
+                sock.sendall(request.payload)
+                if request.timing is not None:
+                    request.timing.mark('send')
+            except socket.error as e:
+                msg = f'GSPro Connector socket error when trying to send shot, Exception: {format(e)}'
+                logging.debug(msg)
+                self.__connection_error(sock, GSProConnectionSocketError(msg))
+            except Exception as e:
+                msg = f"GSPro Connector unknown error when trying to send shot, Exception: {format(e)}"
+                logging.debug(msg)
+                self.__connection_error(sock, GSProConnectionUknownError(msg))
+
+    def __read(self, sock):
+        while self.__active(sock):
+            try:
+                read_socket, write_socket, error_socket = select.select([sock], [], [], 0.5)
+                if read_socket:
+                    data = sock.recv(4096)
+                    if len(data) == 0:
+                        raise GSProConnectionGSProClosedConnection('GSPro closed the connection')
+                    for message, text in self._decoder.decode(data):
+                        self.__received(message, text.encode('utf-8'))
+                self.__check_timeouts()
+            except Exception as e:
+                # A socket closed by terminate_session while waiting is not an error
+                if self.__active(sock):
+                    logging.debug(f'Error reading from GSPro: {format(e)}')
+                    if isinstance(e, (OSError, ValueError)):
+                        e = GSProConnectionSocketError(f'GSPro Connector socket error when reading from GSPro, Exception: {format(e)}')
+                    self.__connection_error(sock, e)
+                break
+
+    def __received(self, message, data):
+        request = None
+        if message.get('Code') != GSProConnect.player_info:
+            request = self.send_queue.response()
+        if request is None:
+            self._messages.put((message, data))
+        else:
+            logging.debug(f"Response from GSPro: {data}")
+            if request.timing is not None:
+                request.timing.mark('response')
+            request.future.set_result(data)
+
+    def __check_timeouts(self):
+        for request in self.send_queue.expired(time.monotonic()):
+            if request.attempt < request.attempts:
+                logging.info('Timed out. Retrying...')
+                self.send_queue.retry(request)
+            else:
+                request.future.set_exception(
+                    GSProConnectionTimeout(f'Failed to send shot to GSPro after {request.attempts} attempts.'))
+
+    def __connection_error(self, sock, error):
+        with self._lock:
+            if not self.__active(sock):
+                return
+            # Stays connected until terminate_session so the error is reported and handled as a disconnect
+            self._failed = True
+        sock.close()
+        if self.auto_reconnect:
+            logging.info(f'Lost connection to GSPro, reconnecting. {format(error)}')
+            # Shots made while reconnecting are kept however many there are
+            self.send_queue.buffer()
+            # Sent again after reconnecting, GSPro never responded to them
+            self.send_queue.requeue_in_flight()
+            threading.Thread(target=self.__reconnect, args=(sock,), name='gspro-reconnect', daemon=True).start()
+            return
+        # Shots queued from now on fail with the error rather than waiting for a connection that is gone
+        self.send_queue.close(error)
+        # Report the error to whoever is waiting for a response, otherwise to the message reader
+        if self.send_queue.fail_all(error) <= 0:
+            self._error = error
+
+    def __reconnect(self, sock):
+        attempt = 0
+        delay = GSProConnect.reconnect_delay
+        while self._connected and self._socket is sock:
+            attempt = attempt + 1
+            self.reconnecting.emit(attempt, delay)
+            if self._stop.wait(delay):
+                return
+            try:
+                new_sock = self.__open_socket()
+            except OSError as e:
+                logging.debug(f'Reconnect attempt {attempt} to GSPro failed: {format(e)}')
+                delay = min(delay * 2, GSProConnect.reconnect_max_delay)
+                continue
+            if not self._connected or self._socket is not sock:
+                # Disconnected while connecting
+                new_sock.close()
+                return
+            logging.info(f'Reconnected to GSPro after {attempt} attempts, {self.send_queue.stats()["depth"]} messages waiting to be sent')
+            self.send_queue.open()
+            self.__start(new_sock)
+            self.reconnected.emit()
+            return
+
+    def next_message(self, timeout=0):
+        """
+        Waits up to timeout seconds for a message from GSPro that isn't a response,
+        returns the message and the data received or None.
+        """
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+        try:
+            return self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
 
     def terminate_session(self):
         if self._socket:
-            self._socket.close()
+            # Clear first so the reader and writer know the socket was closed on purpose
             self._connected = False
+            self._stop.set()
+            self._socket.close()
+            self.send_queue.close()
+            self.send_queue.cancel_all()
@@ -9,6 +9,7 @@ from src.worker_gspro_messages import WorkerGSProMessages
 from src.worker_gspro_start import WorkerGSProStart
 from src.worker_gspro import WorkerGspro
 from src.log_message import LogMessageSystems, LogMessageTypes
+from src.shot_journal import ShotJournal
 from src.worker_thread import WorkerThread
 from PySide6.QtCore import QProcess
 
@@ -34,11 +35,17 @@ class GSProConnection(QObject):
         self.gspro_start_thread = None
         self.connected = False
         self.settings = main_window.settings
+        self.journal = ShotJournal(ShotJournal.default_path(main_window.app_paths))
+        self.journal.open()
         self.gspro_connect = GSProConnect(
             self.settings.device_id,
             self.settings.units,
-            self.settings.api_version
+            self.settings.api_version,
+            self.settings.auto_reconnect == 'Yes',
+            self.journal
         )
+        self.gspro_connect.reconnecting.connect(self.__reconnecting)
+        self.gspro_connect.reconnected.connect(self.__reconnected)
         self.__gspro_disconnected()
         self.__setup_send_shot_thread()
         self.__setup_gspro_messages_thread()
@@ -57,6 +64,7 @@ class GSProConnection(QObject):
         self.send_shot_worker.started.connect(self.__sending_shot)
         self.send_shot_worker.sent.connect(self.main_window.shot_sent)
         self.send_shot_worker.error.connect(self.__send_shot_error)
+        self.send_shot_worker.dropped.connect(self.__shot_dropped)
         self.send_shot_thread.started.connect(self.send_shot_worker.run)
         self.send_shot_thread.start()
 
@@ -110,6 +118,10 @@ class GSProConnection(QObject):
         self.__log_message(LogMessageTypes.LOGS, f'{msg}\nException: {format(error)}')
         QMessageBox.warning(self.main_window, "GSPro Send Error", msg)
 
+    def __shot_dropped(self, balldata, reason):
+        # GSPro is slow to respond rather than gone, so stay connected
+        self.main_window.log_message(LogMessageTypes.ALL, LogMessageSystems.GSPRO_CONNECT, f'Shot not sent to GSPro, {reason}')
+
     def __gspro_messages_error(self, error):
         self.disconnect_from_gspro()
         msg = f"Error while trying to check for new messages from GSPro.\nStart/restart API Connect from GSPro.\nPress 'Connect' to reconnect to GSPro."
@@ -161,6 +173,21 @@ class GSProConnection(QObject):
         self.main_window.gspro_status_label.setStyleSheet(f"QLabel {{ background-color : green; color : white; }}")
         self.connected_to_gspro.emit()
 
+    def __reconnecting(self, attempt, delay):
+        # Shots keep being captured and are sent once reconnected
+        if attempt == 1:
+            self.__log_message(LogMessageTypes.ALL, 'Lost connection to GSPro, reconnecting...')
+        else:
+            self.__log_message(LogMessageTypes.LOGS, f'Reconnect attempt {attempt} to GSPro in {delay:.1f}s')
+        self.main_window.gspro_status_label.setText('Reconnecting...')
+        self.main_window.gspro_status_label.setStyleSheet("QLabel { background-color : orange; color : white; }")
+
+    def __reconnected(self):
+        if self.connected:
+            self.__log_message(LogMessageTypes.ALL, 'Reconnected to GSPro')
+            self.main_window.gspro_status_label.setText('Connected')
+            self.main_window.gspro_status_label.setStyleSheet(f"QLabel {{ background-color : green; color : white; }}")
+
     def __error(self, error):
         self.disconnect_from_gspro()
         msg = "Error while trying to connect to GSPro.\nMake sure GSPro API Connect is running.\nStart/restart API Connect from GSPro.\nPress 'Connect' to reconnect to GSPro."
@@ -171,6 +198,7 @@ class GSProConnection(QObject):
         self.gspro_connect.terminate_session()
         self.connected = False
         self.__shutdown_threads()
+        self.journal.close()
 
     def __log_message(self, types, message):
         self.main_window.log_message(types, LogMessageSystems.GSPRO_CONNECT, message)
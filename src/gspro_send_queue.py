@@ -0,0 +1,202 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from src.custom_exception import GSProConnectionSocketError, GSProSendQueueFull
+
+
+class GSProSendRequest:
+    """
+    A message waiting to be sent to GSPro. Shots are turned into a payload when they
+    are sent so shot numbers stay in order whatever fails or times out.
+    The future is resolved with GSPro's response.
+    """
+
+    def __init__(self, payload: bytes = None, ball_data=None, attempts=2, journal_id=None):
+        self.payload = payload
+        self.journal_id = journal_id
+        self.ball_data = ball_data
+        self.attempts = attempts
+        self.attempt = 0
+        self.shot_number = None
+        self.deadline = None
+        self.timing = ball_data.timing if ball_data is not None else None
+        self.future = Future()
+
+class GSProSendQueue:
+    """
+    Bounded queue of requests for the GSPro writer thread.
+
+    GSPro's responses don't say which message they are for, so only one request is
+    in flight at a time and a response is for the request in flight. A response
+    arriving after its request timed out finds nothing in flight and isn't matched.
+
+    Overflow: nothing already queued is ever dropped. When the queue is full whoever is
+    queuing a request waits up to put_timeout for room, a request that still can't be
+    queued fails with GSProSendQueueFull and is reported as a dropped shot, not as a
+    connection error. While reconnecting (buffer() until open()) nothing can be sent, so
+    requests are queued without waiting whatever the queue's size and are all sent in
+    order once reconnected. Requests queued once the queue is closed fail with the error
+    it was closed with.
+    """
+
+    # Seconds put() waits for room in a full queue
+    put_timeout = 5
+
+    def __init__(self, max_size=8, max_in_flight=1):
+        self.max_size = max_size
+        self.max_in_flight = max_in_flight
+        self.__queue = deque()
+        self.__in_flight = deque()
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__buffering = False
+        self.__error = None
+        self.max_depth = 0
+        self.sent = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def open(self):
+        with self.__condition:
+            self.__closed = False
+            self.__buffering = False
+            self.__error = None
+
+    def buffer(self):
+        """Queue requests without a limit until open(), e.g. while reconnecting, rather than failing them."""
+        with self.__condition:
+            self.__buffering = True
+            # Whoever is waiting for room doesn't need to any more
+            self.__condition.notify_all()
+
+    def close(self, error=None):
+        """Stop queuing requests, requests queued from now on fail with error. Wakes the writer so it can exit."""
+        with self.__condition:
+            self.__closed = True
+            self.__error = error
+            self.__condition.notify_all()
+
+    def put(self, request: GSProSendRequest, timeout=None):
+        """
+        Queue a request, waiting up to timeout seconds, put_timeout by default, if the queue
+        is full and not buffering.
+        """
+        timeout = timeout if timeout is not None else GSProSendQueue.put_timeout
+        with self.__condition:
+            queued = self.__condition.wait_for(
+                lambda: self.__closed or self.__buffering or len(self.__queue) < self.max_size, timeout)
+            if queued and not self.__closed:
+                self.__queue.append(request)
+                self.max_depth = max(self.max_depth, len(self.__queue))
+                self.__condition.notify_all()
+                return request.future
+            self.rejected = self.rejected + 1
+            if self.__closed:
+                error = self.__error if self.__error is not None else GSProConnectionSocketError('Not connected to GSPro')
+            else:
+                error = GSProSendQueueFull(f'GSPro send queue still full after {timeout} seconds, {len(self.__queue)} messages waiting')
+        logging.info(f'{self.__class__.__name__} message not queued: {format(error)}')
+        # Outside the lock, the future's callbacks can queue requests
+        request.future.set_exception(error)
+        return request.future
+
+    def get(self, timeout=None, active=None):
+        """
+        Next request to send, None if there isn't one within timeout or the queue is closed.
+        active is called before a request is taken, while it returns False, e.g. for the
+        writer of a connection that failed, None is returned and the request stays queued.
+        """
+        with self.__condition:
+            available = self.__condition.wait_for(
+                lambda: self.__closed or (active is not None and not active()) or
+                        (len(self.__queue) > 0 and len(self.__in_flight) < self.max_in_flight),
+                timeout)
+            if not available or self.__closed or (active is not None and not active()):
+                return None
+            request = self.__queue.popleft()
+            self.__condition.notify_all()
+            if request.future.done():
+                # Given up on by whoever was waiting for it
+                return None
+            request.attempt = request.attempt + 1
+            self.__in_flight.append(request)
+            self.sent = self.sent + 1
+            return request
+
+    def response(self):
+        """The request a response is for, the one in flight, None if it timed out."""
+        with self.__condition:
+            if len(self.__in_flight) <= 0:
+                return None
+            request = self.__in_flight.popleft()
+            # Room for the next request to be sent and queued
+            self.__condition.notify_all()
+            return request
+
+    def expired(self, now):
+        """Remove and return the requests in flight that have not had a response by their deadline."""
+        with self.__condition:
+            expired = [request for request in self.__in_flight if request.deadline is not None and request.deadline < now]
+            for request in expired:
+                self.__in_flight.remove(request)
+                self.timeouts = self.timeouts + 1
+            if len(expired) > 0:
+                self.__condition.notify_all()
+            return expired
+
+    def retry(self, request: GSProSendRequest):
+        # Send again before anything else
+        with self.__condition:
+            if request in self.__in_flight:
+                self.__in_flight.remove(request)
+            request.deadline = None
+            self.__queue.appendleft(request)
+            self.__condition.notify_all()
+
+    def requeue_in_flight(self):
+        """
+        Put the requests that never had a response back at the front of the queue, in the
+        order they were sent, to be replayed after reconnecting. A shot already queued
+        with the same shot number isn't added twice.
+        """
+        with self.__condition:
+            queued = set(request.shot_number for request in self.__queue if request.shot_number is not None)
+            for request in reversed(self.__in_flight):
+                if request.shot_number is None or request.shot_number not in queued:
+                    request.attempt = 0
+                    request.deadline = None
+                    self.__queue.appendleft(request)
+            self.__in_flight.clear()
+            self.__condition.notify_all()
+
+    def __remove_all(self):
+        requests = list(self.__in_flight) + list(self.__queue)
+        self.__in_flight.clear()
+        self.__queue.clear()
+        return requests
+
+    def fail_all(self, exception):
+        """Fail every waiting request with exception, returns the number failed."""
+        with self.__condition:
+            requests = self.__remove_all()
+        for request in requests:
+            request.future.set_exception(exception)
+        return len(requests)
+
+    def cancel_all(self):
+        with self.__condition:
+            requests = self.__remove_all()
+        for request in requests:
+            request.future.cancel()
+
+    def stats(self):
+        with self.__condition:
+            return {
+                'depth': len(self.__queue),
+                'in_flight': len(self.__in_flight),
+                'max_depth': self.max_depth,
+                'sent': self.sent,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts
+            }
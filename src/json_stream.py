@@ -0,0 +1,96 @@
+import codecs
+import json
+import logging
+import re
+
+
+class JSONStreamDecoder:
+    """
+    Splits a stream of concatenated JSON objects, as sent by GSPro and the relay
+    server clients, into messages as soon as each object is closed.
+
+    Complete objects are parsed straight from the received text by the C JSON
+    decoder. Only when an object has been cut off part way is it scanned for its
+    closing brace, the scan carries on from where it stopped as more data arrives
+    so the partial object is only parsed again once it is complete. Multi byte
+    characters can be split across reads and anything between objects is skipped.
+    """
+    # Braces, or a whole string so braces inside strings are skipped, the closing quote
+    # group is empty if the string hasn't been completely received yet
+    tokens = re.compile(r'[{}]|"[^"\\]*(?:\\.[^"\\]*)*(")?', re.DOTALL)
+
+    def __init__(self, max_size=1024 * 1024):
+        self.max_size = max_size
+        self.text = ''
+        self.__utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.__decoder = json.JSONDecoder()
+        # Scan state of the incomplete object at the start of text
+        self.__scanned = 0
+        self.__depth = 0
+
+    def __scan(self, text, position, depth):
+        # Returns the end of the object if it has been closed, otherwise None and
+        # the position and depth to carry on scanning from when more data arrives
+        for match in JSONStreamDecoder.tokens.finditer(text, position):
+            token = match.group()
+            if token == '{':
+                depth = depth + 1
+            elif token == '}':
+                depth = depth - 1
+                if depth <= 0:
+                    return match.end(), match.end(), 0
+            elif match.group(1) is None:
+                # Rest of the string not received yet, scan it again when it is
+                return None, match.start(), depth
+        return None, len(text), depth
+
+    def decode(self, data: bytes):
+        """Add received data, returns the message and text of each JSON object that is now complete."""
+        text = self.text + self.__utf8.decode(data)
+        results = []
+        position = 0
+        if self.__depth > 0:
+            end, self.__scanned, self.__depth = self.__scan(text, self.__scanned, self.__depth)
+            if end is None:
+                self.__keep(text)
+                return results
+        while True:
+            position = text.find('{', position)
+            if position < 0:
+                self.text = ''
+                break
+            try:
+                message, end = self.__decoder.raw_decode(text, position)
+            except json.JSONDecodeError as e:
+                end, scanned, depth = self.__scan(text, position + 1, 1)
+                if end is None:
+                    # Not complete yet
+                    self.__scanned = scanned - position
+                    self.__depth = depth
+                    self.__keep(text[position:])
+                    break
+                logging.debug(f'{self.__class__.__name__} skipping invalid message: {text[position:end]} {format(e)}')
+            else:
+                results.append((message, text[position:end]))
+            position = end
+        return results
+
+    def __keep(self, text):
+        self.text = text
+        if len(text) > self.max_size:
+            logging.debug(f'{self.__class__.__name__} incomplete message larger than {self.max_size} characters, discarding')
+            self.reset()
+
+    def feed(self, data: bytes):
+        """Add received data, returns the messages that are now complete."""
+        return [message for message, text in self.decode(data)]
+
+    def frames(self, data: bytes):
+        """Add received data, returns the bytes of each JSON object that is now complete."""
+        return [text.encode('utf-8') for message, text in self.decode(data)]
+
+    def reset(self):
+        self.text = ''
+        self.__utf8.reset()
+        self.__scanned = 0
+        self.__depth = 0
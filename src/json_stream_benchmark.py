@@ -0,0 +1,71 @@
+"""
+Compares JSONStreamDecoder with the regex split previously used to frame GSPro
+messages, on bursts of several messages per read.
+
+Usage:
+
+    python -m src.json_stream_benchmark [--messages N] [--repeat N]
+"""
+import argparse
+import json
+import re
+import time
+from src.json_stream import JSONStreamDecoder
+
+player_info = {"Code": 201, "Message": "GSPro Player Information",
+               "Player": {"Handed": "RH", "Club": "DR", "DistanceToTarget": 420}}
+shot_response = {"Code": 200, "Message": "Ball Data received", "Player": None}
+
+
+def regex_split(data: bytes):
+    # Framing used by WorkerGSProMessages before JSONStreamDecoder
+    messages = []
+    for json_message in re.split(r'(\{.*?})(?= *\{)', data.decode("utf-8")):
+        if len(json_message) > 0:
+            messages.append(json.loads(json_message))
+    return messages
+
+
+
+def burst(count):
+    messages = [player_info if i % 2 == 0 else shot_response for i in range(count)]
+    return messages, b''.join(json.dumps(message).encode('utf-8') for message in messages)
+
+
+def run(name, reads, expected, parse, repeat):
+    failures = 0
+    start = time.perf_counter_ns()
+    for i in range(repeat):
+        messages = []
+        for read in reads:
+            try:
+                messages.extend(parse(read))
+            except ValueError:
+                failures = failures + 1
+        if messages != expected:
+            failures = failures + 1
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    rate = len(expected) * repeat / elapsed if elapsed > 0 else 0
+    print(f'  {name:<10}{rate:>14.0f} messages/s {failures:>8} failed runs of {repeat}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GSPro message framing')
+    parser.add_argument('--messages', type=int, default=20, help='messages per burst')
+    parser.add_argument('--repeat', type=int, default=2000, help='number of bursts')
+    args = parser.parse_args()
+    expected, data = burst(args.messages)
+    # Split reads cut messages part way, as TCP can
+    cases = {
+        'burst in one read': [data],
+        'burst split every 1000 bytes': [data[i:i + 1000] for i in range(0, len(data), 1000)]
+    }
+    for case in cases:
+        print(f'{args.messages} messages, {case}:')
+        run('regex', cases[case], expected, regex_split, args.repeat)
+        decoder = JSONStreamDecoder()
+        run('decoder', cases[case], expected, decoder.feed, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import dataclasses
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+
+from src.ball_data import BallData, BallMetrics
+from src.settings import LaunchMonitor
+
+
+@dataclass(frozen=True)
+class OcrConstraints:
+    """What tesseract can read for a metric, applied to the engine before the metric's ROI is OCR'd."""
+    # Characters tesseract can return, any if None
+    whitelist: str = None
+    # Tesseract user patterns the text matches, e.g. r'\d\*.\d', see ocr_patterns
+    patterns: tuple = ()
+    # Longer text is a misread and is OCR'd again as a raw line
+    max_length: int = None
+    # Resolution hint, tesseract estimates it from the text size if None
+    dpi: int = None
+
+
+def metric_constraints(direction_prefix=(), direction_suffix=(), unconstrained=(), shown_as_spin=()):
+    """
+    OcrConstraints for each metric by how it is shown, read only. Speeds are decimals,
+    spins whole numbers with a thousands separator and angles and side spin can be
+    negative, or have an L or R before or after them for the metrics in direction_prefix
+    and direction_suffix. Metrics in unconstrained can be read as anything, the ROI's of
+    the metrics in shown_as_spin show a spin instead, e.g. side spin in the spin axis ROI.
+    """
+    # Characters, patterns without a sign and longest text for each kind of metric
+    speed = ('0123456789.', (r'\d\*.\d',), 6)
+    spin = ('0123456789,', (r'\d\*',), 7)
+    angle = ('0123456789.', (r'\d\*.\d',), 6)
+    kinds = {
+        BallMetrics.SPEED: (speed, False),
+        BallMetrics.CLUB_SPEED: (speed, False),
+        BallMetrics.SPEED_AT_IMPACT: (speed, False),
+        BallMetrics.TOTAL_SPIN: (spin, False),
+        BallMetrics.BACK_SPIN: (spin, False),
+        BallMetrics.SIDE_SPIN: (spin, True),
+        BallMetrics.SPIN_AXIS: (angle, True),
+        BallMetrics.HLA: (angle, True),
+        BallMetrics.VLA: (angle, True),
+        BallMetrics.CLUB_PATH: (angle, True),
+        BallMetrics.CLUB_FACE_TO_TARGET: (angle, True),
+        BallMetrics.CLUB_FACE_TO_PATH: (angle, True),
+        BallMetrics.ANGLE_OF_ATTACK: (angle, True)
+    }
+    constraints = {}
+    for metric, ((whitelist, patterns, max_length), signed) in kinds.items():
+        if metric in shown_as_spin:
+            whitelist, patterns, max_length = spin
+        if metric in unconstrained:
+            continue
+        if metric in direction_prefix:
+            whitelist = whitelist + 'LR'
+            patterns = patterns + tuple(f'{direction}{pattern}' for direction in 'LR' for pattern in patterns)
+        elif metric in direction_suffix:
+            whitelist = whitelist + 'LR'
+            patterns = patterns + tuple(f'{pattern}{direction}' for direction in 'LR' for pattern in patterns)
+        elif signed:
+            whitelist = whitelist + '-'
+            patterns = patterns + tuple(f'-{pattern}' for pattern in patterns)
+        constraints[metric] = OcrConstraints(whitelist=whitelist, patterns=patterns, max_length=max_length)
+    return MappingProxyType(constraints)
+
+
+def ocr_patterns(constraints):
+    """
+    The user patterns of all the metrics in constraints, tesseract engines are created
+    with these as the patterns can't be changed for each ROI like the whitelist can.
+    """
+    return tuple(sorted({pattern for constraint in constraints.values() for pattern in constraint.patterns}))
+
+
+def metric_labels(overrides=None):
+    """BallData.properties with the names a launch monitor shows for some metrics, read only."""
+    labels = dict(BallData.properties)
+    if overrides is not None:
+        labels.update(overrides)
+    return MappingProxyType(labels)
+
+
+@dataclass(frozen=True)
+class LaunchMonitorProfile:
+    """
+    Everything about reading a launch monitor's mirror app screen that depends on
+    the launch monitor, looked up once when it is selected.
+    """
+    name: str
+    # Tesseract traineddata file, without the extension
+    train_file: str
+    # Metrics read, one ROI each
+    rois: tuple
+    # Names of the metrics as shown by the launch monitor
+    labels: Mapping
+    must_not_be_zero: tuple
+    # Minimum mean squared error between screenshots for the screen to have changed
+    mse_min: int = 100
+    # Threshold to black text on a white background and crop to the text before OCR
+    threshold: bool = False
+    # ROI's can be enlarged before OCR, see the zoom_images setting
+    zoom: bool = False
+    # Putts are parsed by BallData.process_putt_data rather than ShotDataParser
+    putting: bool = False
+    # A changed screen is only read once it has been unchanged for this many screenshots
+    # and milliseconds, so metrics that are animated in are read once, see SettleDetector
+    settle_frames: int = 1
+    settle_ms: int = 0
+    # Read ROI's with the glyph templates in <train_file>.npz before tesseract, see TemplateRecognizer
+    glyph_templates: bool = False
+    # OcrConstraints for each metric, metrics without any are read unconstrained
+    constraints: Mapping = field(default_factory=lambda: MappingProxyType({}))
+
+
+class LaunchMonitorProfiles:
+
+    default_labels = metric_labels({
+        BallMetrics.HLA: 'Launch Direction (HLA)',
+        BallMetrics.VLA: 'Launch Angle (VLA)',
+        BallMetrics.CLUB_PATH: 'Club path',
+        BallMetrics.ANGLE_OF_ATTACK: 'Angle of Attack',
+        BallMetrics.CLUB_FACE_TO_TARGET: 'Impact Angle'
+    })
+    default = LaunchMonitorProfile(
+        name='default',
+        train_file='train',
+        rois=tuple(BallData.rois_properties),
+        labels=default_labels,
+        must_not_be_zero=tuple(BallData.must_not_be_zero),
+        constraints=metric_constraints())
+    # Metrics shown with a direction after the value by the Mevo+ and R50, e.g. 2.5L. The
+    # angle of attack's direction isn't left or right so it is left unconstrained
+    # The TruGolf apps show the side spin, which can be negative, where the spin axis is usually shown
+    trugolf_constraints = metric_constraints(shown_as_spin=(BallMetrics.SPIN_AXIS,))
+    mevo_constraints = metric_constraints(
+        direction_suffix=(BallMetrics.HLA, BallMetrics.SPIN_AXIS, BallMetrics.CLUB_PATH,
+                          BallMetrics.CLUB_FACE_TO_TARGET, BallMetrics.CLUB_FACE_TO_PATH),
+        unconstrained=(BallMetrics.ANGLE_OF_ATTACK,))
+    exputt = LaunchMonitorProfile(
+        name='ExPutt',
+        train_file='exputt',
+        rois=tuple(BallData.rois_putting_properties),
+        labels=metric_labels({
+            BallMetrics.HLA: 'Launch Dir',
+            BallMetrics.CLUB_PATH: 'Putter path',
+            BallMetrics.CLUB_FACE_TO_TARGET: 'Impact Angle'
+        }),
+        must_not_be_zero=tuple(BallData.must_not_be_zero_putt),
+        mse_min=400,
+        putting=True,
+        constraints=metric_constraints(
+            direction_prefix=(BallMetrics.HLA, BallMetrics.CLUB_PATH, BallMetrics.CLUB_FACE_TO_TARGET)))
+    uneekor_labels = metric_labels({
+        BallMetrics.VLA: 'Launch Angle',
+        BallMetrics.HLA: 'Side Angle',
+        BallMetrics.CLUB_PATH: 'Club path',
+        BallMetrics.ANGLE_OF_ATTACK: 'Attack Angle'
+    })
+    profiles = dict((profile.name, profile) for profile in [
+        dataclasses.replace(default, name=LaunchMonitor.MLM2PRO, threshold=True, zoom=True, glyph_templates=True),
+        dataclasses.replace(default, name=LaunchMonitor.FSKIT, train_file='fskit'),
+        dataclasses.replace(default, name=LaunchMonitor.TRACKMAN, train_file='trackman'),
+        dataclasses.replace(default, name=LaunchMonitor.TRUGOLF_APOGEE, train_file='apex', constraints=trugolf_constraints),
+        dataclasses.replace(default, name=LaunchMonitor.TRUGOLF_APOGEE_AID, train_file='apex_aid',
+                            constraints=trugolf_constraints),
+        dataclasses.replace(default, name=LaunchMonitor.XSWINGPRO, train_file='xswingpro',
+                            constraints=metric_constraints(
+                                direction_suffix=(BallMetrics.SIDE_SPIN, BallMetrics.CLUB_PATH, BallMetrics.HLA))),
+        dataclasses.replace(default, name=LaunchMonitor.SQUARE, train_file='square',
+                            constraints=metric_constraints(direction_prefix=(BallMetrics.SPIN_AXIS, BallMetrics.HLA))),
+        dataclasses.replace(default, name=LaunchMonitor.SC4, train_file='voicecaddiesc4'),
+        LaunchMonitorProfile(
+            name=LaunchMonitor.UNEEKOR,
+            train_file='uneekor',
+            rois=tuple(BallData.rois_uneekor_properties),
+            labels=uneekor_labels,
+            must_not_be_zero=tuple(BallData.must_not_be_zero_uneekor),
+            mse_min=300,
+            constraints=metric_constraints(
+                direction_suffix=(BallMetrics.SIDE_SPIN, BallMetrics.CLUB_PATH, BallMetrics.HLA)),
+            # The Uneekor app animates the metrics in
+            settle_frames=2),
+        LaunchMonitorProfile(
+            name=LaunchMonitor.UNEEKOR_IPAD,
+            train_file='uneekor_ipad',
+            rois=tuple(BallData.rois_uneekor_properties),
+            labels=uneekor_labels,
+            must_not_be_zero=tuple(BallData.must_not_be_zero_uneekor),
+            mse_min=300,
+            constraints=metric_constraints(),
+            # The Uneekor app animates the metrics in
+            settle_frames=2),
+        LaunchMonitorProfile(
+            name=LaunchMonitor.MEVOPLUS,
+            train_file='mevo',
+            rois=tuple(BallData.rois_mevoplus_properties),
+            labels=metric_labels({
+                BallMetrics.VLA: 'Launch V',
+                BallMetrics.HLA: 'Launch H',
+                BallMetrics.CLUB_PATH: 'Club path',
+                BallMetrics.ANGLE_OF_ATTACK: 'AOA',
+                BallMetrics.CLUB_FACE_TO_TARGET: 'Face to target',
+                BallMetrics.CLUB_FACE_TO_PATH: 'Face to path'
+            }),
+            must_not_be_zero=tuple(BallData.must_not_be_zero),
+            constraints=mevo_constraints),
+        LaunchMonitorProfile(
+            name=LaunchMonitor.R50,
+            train_file='r50',
+            rois=tuple(BallData.rois_r50_properties),
+            labels=metric_labels({
+                BallMetrics.HLA: 'Launch Direction',
+                BallMetrics.VLA: 'Launch Angle',
+                BallMetrics.CLUB_PATH: 'Club path',
+                BallMetrics.ANGLE_OF_ATTACK: 'Attack Angle',
+                BallMetrics.CLUB_FACE_TO_PATH: 'Face to Path',
+                BallMetrics.CLUB_FACE_TO_TARGET: 'Club Face'
+            }),
+            must_not_be_zero=tuple(BallData.must_not_be_zero_r50),
+            constraints=mevo_constraints),
+        LaunchMonitorProfile(
+            name=LaunchMonitor.SKYTRAKPLUS,
+            train_file='skytrak',
+            rois=tuple(BallData.rois_skytrak_properties),
+            labels=metric_labels({
+                BallMetrics.VLA: 'Launch Angle',
+                BallMetrics.HLA: 'Side Angle',
+                BallMetrics.CLUB_PATH: 'Club path',
+                BallMetrics.CLUB_FACE_TO_TARGET: 'Face to target',
+                BallMetrics.CLUB_FACE_TO_PATH: 'Face to path'
+            }),
+            must_not_be_zero=tuple(BallData.must_not_be_zero),
+            # SkyTrak shows the word Center for a straight launch
+            constraints=metric_constraints(unconstrained=(BallMetrics.HLA,)))
+    ])
+    # Default profiles for the launch monitors without their own profile, by launch monitor
+    default_profiles = {}
+
+    @staticmethod
+    def get(launch_monitor):
+        """Profile for the launch monitor, launch monitors without their own profile use the default one."""
+        profile = LaunchMonitorProfiles.profiles.get(launch_monitor)
+        if profile is None:
+            # Kept so the same profile, and the parser built for it, is used for every frame
+            profile = LaunchMonitorProfiles.default_profiles.get(launch_monitor)
+            if profile is None:
+                profile = dataclasses.replace(LaunchMonitorProfiles.default, name=launch_monitor)
+                profile = LaunchMonitorProfiles.default_profiles.setdefault(launch_monitor, profile)
+        return profile
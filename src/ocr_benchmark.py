@@ -0,0 +1,279 @@
+"""
+Headless OCR benchmark, replays recorded mirror app frames through the same
+capture -> MSE -> OCR -> BallData path the connector uses for a shot.
+
+Usage (from the folder containing the .traineddata files):
+
+    python -m src.ocr_benchmark DATASET [DATASET ...] [--parallel-ocr] [--allocations] [--json FILE]
+
+A dataset is a folder containing a benchmark.json file:
+
+    {
+        "launch_monitor": "Rapsodo MLM2PRO",
+        "device": "device_iphone.json",
+        "frames": "frames",
+        "labels": "labels.json",
+        "interval_ms": 250,
+        "club": "DR",
+        "settings": {"zoom_images": "No", "colour_threshold": 180}
+    }
+
+device is a device config file saved by the connector, it supplies the ROI's.
+frames is a folder of screenshots or a screen recording of the mirror app.
+labels maps a frame (image file name, or frame number for a recording) to the
+metric values shown on screen, e.g. {"0001.png": {"speed": 150.2, "total_spin": 2500}}.
+Only interval_ms, club, labels and settings are optional.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from src.appdata import AppDataPaths
+from src.capture_source import FrameClock, ImageDirectoryCaptureSource, VideoFileCaptureSource
+from src.custom_exception import CaptureSourceFinished
+from src.device import Device
+from src.screenshot import Screenshot
+from src.settings import Settings
+
+
+class BenchmarkResult:
+
+    def __init__(self, name, launch_monitor):
+        self.name = name
+        self.launch_monitor = launch_monitor
+        self.train_file = None
+        self.frames = 0
+        self.ocr_frames = 0
+        self.shots = 0
+        self.timings = {}
+        self.allocated = []
+        self.ring_allocations = 0
+        self.ring_bytes_allocated = 0
+        self.ocr_cache = None
+        self.settle = None
+        self.templates = None
+        self.labelled_frames = 0
+        self.metrics = {}
+
+    def add_timing(self, timing, total):
+        for stage in timing.stages:
+            self.timings.setdefault(stage, []).append(timing.stages[stage])
+        for roi in timing.rois:
+            self.timings.setdefault(f'ocr {roi}', []).append(timing.rois[roi])
+        self.timings.setdefault('total', []).append(total)
+
+    def add_labels(self, labels, balldata):
+        self.labelled_frames = self.labelled_frames + 1
+        for metric in labels:
+            if metric not in self.metrics:
+                self.metrics[metric] = {'correct': 0, 'total': 0}
+            self.metrics[metric]['total'] = self.metrics[metric]['total'] + 1
+            if balldata is not None and same_value(getattr(balldata, metric, None), labels[metric]):
+                self.metrics[metric]['correct'] = self.metrics[metric]['correct'] + 1
+
+    @staticmethod
+    def percentiles(values):
+        if len(values) <= 0:
+            return None
+        return {
+            'p50': float(np.percentile(values, 50)),
+            'p95': float(np.percentile(values, 95)),
+            'p99': float(np.percentile(values, 99)),
+            'max': float(np.max(values))
+        }
+
+    def frames_per_second(self):
+        total = sum(self.timings.get('total', []))
+        if total <= 0:
+            return 0
+        return self.frames / (total / 1e9)
+
+    def accuracy(self):
+        total = sum(metric['total'] for metric in self.metrics.values())
+        if total <= 0:
+            return None
+        return sum(metric['correct'] for metric in self.metrics.values()) / total
+
+    def to_dict(self):
+        ms = {}
+        for stage in self.timings:
+            ms[stage] = BenchmarkResult.percentiles([value / 1e6 for value in self.timings[stage]])
+        return {
+            'dataset': self.name,
+            'launch_monitor': self.launch_monitor,
+            'train_file': self.train_file,
+            'frames': self.frames,
+            'ocr_frames': self.ocr_frames,
+            'shots': self.shots,
+            'frames_per_second': self.frames_per_second(),
+            'latency_ms': ms,
+            'labelled_frames': self.labelled_frames,
+            'accuracy': self.accuracy(),
+            'metrics': self.metrics,
+            'bytes_allocated_per_frame': BenchmarkResult.percentiles(self.allocated),
+            'frame_buffer_allocations': self.ring_allocations,
+            'frame_buffer_bytes_allocated': self.ring_bytes_allocated,
+            'ocr_cache': self.ocr_cache,
+            'settle': self.settle,
+            'templates': self.templates
+        }
+
+    def print(self):
+        result = self.to_dict()
+        print(f"{result['dataset']}: {result['launch_monitor']} ({result['train_file']}.traineddata)")
+        print(f"  frames: {result['frames']} ocr: {result['ocr_frames']} shots: {result['shots']} frames/s: {result['frames_per_second']:.1f}")
+        print(f"  {'stage (ms)':<24}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+        for stage in result['latency_ms']:
+            values = result['latency_ms'][stage]
+            if values is not None:
+                print(f"  {stage:<24}{values['p50']:>10.2f}{values['p95']:>10.2f}{values['p99']:>10.2f}{values['max']:>10.2f}")
+        if result['accuracy'] is not None:
+            print(f"  accuracy: {result['accuracy'] * 100:.1f}% over {result['labelled_frames']} labelled frames")
+            for metric in result['metrics']:
+                counts = result['metrics'][metric]
+                print(f"    {metric:<18}{counts['correct']:>6}/{counts['total']}")
+        if result['bytes_allocated_per_frame'] is not None:
+            allocated = result['bytes_allocated_per_frame']
+            print(f"  bytes allocated per frame p50: {allocated['p50']:.0f} p95: {allocated['p95']:.0f} max: {allocated['max']:.0f}")
+        print(f"  frame buffers allocated: {result['frame_buffer_allocations']} ({result['frame_buffer_bytes_allocated']} bytes)")
+        cache = result['ocr_cache']
+        if cache is not None and cache['hit_rate'] is not None:
+            print(f"  ocr cache hits: {cache['hits']} misses: {cache['misses']} ({cache['hit_rate'] * 100:.1f}%) entries: {cache['entries']}")
+        if result['settle'] is not None:
+            print(f"  changes read once settled: {result['settle']['settled']} ocr passes saved: {result['settle']['saved']}")
+        templates = result['templates']
+        if templates is not None and templates['read_rate'] is not None:
+            print(f"  read by glyph templates: {templates['reads']} by tesseract: {templates['fallbacks']} ({templates['read_rate'] * 100:.1f}% templates)")
+
+
+def same_value(value, expected):
+    try:
+        return abs(float(value) - float(expected)) < 1e-6
+    except (TypeError, ValueError):
+        return str(value) == str(expected)
+
+
+def load_dataset(path):
+    with open(os.path.join(path, 'benchmark.json'), 'r') as file:
+        dataset = json.load(file)
+    labels = {}
+    if 'labels' in dataset:
+        with open(os.path.join(path, dataset['labels']), 'r') as file:
+            labels = json.load(file)
+    return dataset, labels
+
+
+def load_device(path, file_name):
+    # Device.load() builds a windows path so read the device file directly
+    device = Device(1, os.path.splitext(file_name)[0], '', {'left': 0, 'top': 0, 'right': 0, 'bottom': 0}, '', {}, path, False)
+    with open(os.path.join(path, file_name), 'r') as file:
+        settings = json.load(file)
+    for key in settings:
+        setattr(device, key, settings[key])
+    return device
+
+
+def load_capture_source(path, dataset):
+    clock = FrameClock(dataset.get('interval_ms', 250))
+    frames = os.path.join(path, dataset['frames'])
+    if os.path.isdir(frames):
+        return ImageDirectoryCaptureSource(frames, clock)
+    return VideoFileCaptureSource(frames, clock)
+
+
+def load_settings(dataset, home_folder):
+    # Default settings with the dataset overrides, nothing is written to the connector's settings
+    app_paths = AppDataPaths('mlm2pro-gspro-connect', home_folder_path=home_folder)
+    app_paths.setup()
+    settings = Settings(app_paths)
+    for key, value in dataset.get('settings', {}).items():
+        setattr(settings, key, value)
+    settings.device_id = dataset['launch_monitor']
+    return settings
+
+
+def run_dataset(path, parallel_ocr=False, allocations=False):
+    dataset, labels = load_dataset(path)
+    capture_source = load_capture_source(path, dataset)
+    device = load_device(path, dataset['device'])
+    result = BenchmarkResult(os.path.basename(os.path.normpath(path)), dataset['launch_monitor'])
+    with tempfile.TemporaryDirectory() as home_folder:
+        settings = load_settings(dataset, home_folder)
+        settings.parallel_ocr = 'Yes' if parallel_ocr else 'No'
+        screenshot = Screenshot(settings, capture_source=capture_source)
+        screenshot.selected_club = dataset.get('club', 'DR')
+        if allocations:
+            tracemalloc.start()
+        try:
+            while True:
+                if allocations:
+                    tracemalloc.reset_peak()
+                    allocated_before = tracemalloc.get_traced_memory()[0]
+                start = time.perf_counter_ns()
+                try:
+                    screenshot.capture_screenshot(device)
+                except CaptureSourceFinished:
+                    break
+                if screenshot.screenshot_new:
+                    screenshot.ocr_image()
+                total = time.perf_counter_ns() - start
+                if allocations:
+                    result.allocated.append(tracemalloc.get_traced_memory()[1] - allocated_before)
+                result.frames = result.frames + 1
+                result.add_timing(screenshot.timing, total)
+                if screenshot.screenshot_new:
+                    result.ocr_frames = result.ocr_frames + 1
+                    if screenshot.new_shot and screenshot.balldata.good_shot:
+                        result.shots = result.shots + 1
+                # The metrics shown for a frame are the last ones read, a frame that didn't change isn't OCR'd again
+                frame = frame_label(capture_source)
+                if frame in labels:
+                    result.add_labels(labels[frame], screenshot.balldata)
+        finally:
+            if allocations:
+                tracemalloc.stop()
+            if parallel_ocr:
+                result.train_file = screenshot.tesserocr_thread_pool.train_file
+            else:
+                result.train_file = screenshot.tesserocr_pool.train_file
+            result.ring_allocations = screenshot.frame_ring.allocations
+            result.ring_bytes_allocated = screenshot.frame_ring.bytes_allocated
+            result.ocr_cache = screenshot.frame_reader.ocr_cache.stats()
+            result.settle = screenshot.settle_detector.stats()
+            result.templates = screenshot.frame_reader.template_recognizer.stats()
+            screenshot.end_ocr()
+            capture_source.close()
+    return result
+
+
+def frame_label(capture_source):
+    if isinstance(capture_source, ImageDirectoryCaptureSource):
+        return os.path.basename(capture_source.current_file)
+    return str(capture_source.frame_index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded mirror app frames through the OCR pipeline and report latency and accuracy')
+    parser.add_argument('datasets', nargs='+', help='dataset folders containing a benchmark.json file')
+    parser.add_argument('--parallel-ocr', action='store_true', help='OCR the ROI\'s of a frame in parallel')
+    parser.add_argument('--allocations', action='store_true', help='measure the bytes allocated per frame, slows the benchmark down')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--debug', action='store_true', help='show debug logging')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    results = []
+    for dataset in args.datasets:
+        result = run_dataset(dataset, parallel_ocr=args.parallel_ocr, allocations=args.allocations)
+        result.print()
+        results.append(result.to_dict())
+    if args.json:
+        with open(args.json, 'w') as file:
+            file.write(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    main()
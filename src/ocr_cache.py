@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class OcrCache:
+    """
+    Least recently used cache of OCR results keyed by a hash of the preprocessed ROI
+    image and the tesseract engine and constraints that read it. The same digits are shown shot after
+    shot, so most ROI's read are ones tesseract has already recognised.
+
+    Bounded by the number of entries and the approximate memory they use, the least
+    recently used entries are evicted first.
+    """
+
+    # Rough size of an entry excluding its text, the key, tuple and OrderedDict node
+    entry_overhead = 200
+
+    def __init__(self, max_entries=4096, max_bytes=4 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(image, train_file, train_file_mtime, psm, constraints=None, patterns=()):
+        digest = hashlib.blake2b(np.ascontiguousarray(image), digest_size=16)
+        # Images with the same pixels in a different shape read differently
+        digest.update(repr((image.shape, train_file, train_file_mtime, int(psm), constraints, patterns)).encode())
+        return digest.digest()
+
+    def get(self, key):
+        """The (text, confidence) cached for key, None if it isn't cached."""
+        with self.__lock:
+            result = self.__entries.get(key)
+            if result is None:
+                self.misses = self.misses + 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits = self.hits + 1
+            return result
+
+    def put(self, key, text, confidence):
+        with self.__lock:
+            if key in self.__entries:
+                return
+            self.__entries[key] = (text, confidence)
+            self.bytes = self.bytes + OcrCache.__entry_size(text)
+            while len(self.__entries) > self.max_entries or (self.bytes > self.max_bytes and len(self.__entries) > 1):
+                _, (evicted_text, _) = self.__entries.popitem(last=False)
+                self.bytes = self.bytes - OcrCache.__entry_size(evicted_text)
+                self.evictions = self.evictions + 1
+
+    @staticmethod
+    def __entry_size(text):
+        return OcrCache.entry_overhead + len(text)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.__entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups > 0 else None
+            }
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+# PIL's fixed point ITU-R 601-2 luma weights, used so the grey scale image is
+# exactly the one PIL's convert('L') produced and Tesseract sees the same pixels
+luma_weights = np.array([19595, 38470, 7471], dtype=np.uint32)
+
+
+def grey_scale(image):
+    """
+    8 bit grey scale copy of an ROI image cut from the screenshot, the same as
+    Image.fromarray(np.uint8(image)).convert('L') without going through PIL.
+    """
+    image = np.uint8(image)
+    if image.ndim == 2:
+        return image
+    if image.ndim == 3 and image.shape[2] == 1:
+        return image[:, :, 0]
+    grey = image[:, :, :3].astype(np.uint32) @ luma_weights
+    grey += 0x8000
+    grey >>= 16
+    return grey.astype(np.uint8)
+
+
+def threshold_crop(grey, threshold, padding=5):
+    """
+    Black text on a white background, pixels brighter than threshold become black,
+    cropped to the text plus padding pixels on each side.
+
+    Returns the image and the (left, upper, right, lower) box it was cropped to, None
+    if there is no text. Padding past the right or lower edge is black, as it was
+    when PIL cropped the image.
+    """
+    # The text is the pixels above the threshold, cv2.threshold floors a fractional
+    # threshold which gives the same result for 8 bit pixels
+    _, mask = cv2.threshold(grey, threshold, 255, cv2.THRESH_BINARY)
+    image = cv2.bitwise_not(mask)
+    x, y, w, h = cv2.boundingRect(mask)
+    if w <= 0 or h <= 0:
+        return image, None
+    left = max(x - padding, 0)
+    upper = max(y - padding, 0)
+    right = x + w + padding
+    lower = y + h + padding
+    height, width = image.shape
+    if right <= width and lower <= height:
+        return image[upper:lower, left:right].copy(), (left, upper, right, lower)
+    cropped = np.zeros((lower - upper, right - left), dtype=np.uint8)
+    cropped[:min(lower, height) - upper, :min(right, width) - left] = image[upper:lower, left:right]
+    return cropped, (left, upper, right, lower)
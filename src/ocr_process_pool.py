@@ -0,0 +1,120 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import numpy as np
+from src.frame_reader import FrameReader
+from src.launch_monitor_profile import LaunchMonitorProfiles
+
+# Each OCR process has its own frame reader, and with it its own tesseract engines
+_frame_reader = None
+
+
+def _start_process(path):
+    global _frame_reader
+    _frame_reader = FrameReader(path)
+
+
+def _read_frame(name, shape, offset, rois, launch_monitor, options, selected_club, timing):
+    # Attached for this read only, a slot the parent replaces with a larger one must not stay mapped here
+    frame = shared_memory.SharedMemory(name=name)
+    try:
+        image = np.ndarray(shape, dtype=np.uint8, buffer=frame.buf)
+        try:
+            return _frame_reader.read(image, offset, rois, LaunchMonitorProfiles.get(launch_monitor),
+                                      options, selected_club, timing)
+        finally:
+            # The shared memory can't be closed while a view of it exists
+            del image
+    finally:
+        frame.close()
+
+
+class OcrProcessPool:
+    """
+    Reads frames in separate processes so OCR and parsing don't compete with the GUI
+    for the GIL, and the next frame can be captured while the last one is still being
+    read. Frames are copied into a fixed number of shared memory slots rather than
+    pickled, a slot is reused once the frame in it has been read.
+    """
+
+    def __init__(self, processes=2, slots=4, path='.\\'):
+        self.processes = processes
+        self.path = path
+        self.__executor = None
+        self.__slots = [None] * slots
+        self.__busy = [False] * slots
+        self.__lock = threading.Lock()
+
+    def start(self):
+        if self.__executor is None:
+            logging.debug(f'{self.__class__.__name__} starting {self.processes} OCR processes')
+            # Spawned the same way on every platform, the processes don't inherit the GUI
+            self.__executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_start_process,
+                initargs=(self.path,))
+
+    def __acquire(self, nbytes):
+        with self.__lock:
+            for i in range(len(self.__slots)):
+                if not self.__busy[i]:
+                    slot = self.__slots[i]
+                    if slot is None or slot.size < nbytes:
+                        if slot is not None:
+                            slot.close()
+                            slot.unlink()
+                        slot = shared_memory.SharedMemory(create=True, size=nbytes)
+                        self.__slots[i] = slot
+                    self.__busy[i] = True
+                    return i
+        return None
+
+    def __release(self, index):
+        with self.__lock:
+            self.__busy[index] = False
+
+    def submit(self, image, offset, rois, launch_monitor, options, selected_club, timing):
+        """
+        Read a frame in an OCR process, returns a future for its BallData,
+        or None if every slot is waiting to be read.
+        """
+        self.start()
+        index = self.__acquire(image.nbytes)
+        if index is None:
+            return None
+        slot = self.__slots[index]
+        frame = np.ndarray(image.shape, dtype=np.uint8, buffer=slot.buf)
+        np.copyto(frame, image)
+        del frame
+        args = (slot.name, image.shape, offset, rois, launch_monitor, options, selected_club, timing)
+        try:
+            try:
+                future = self.__executor.submit(_read_frame, *args)
+            except BrokenProcessPool:
+                # An OCR process died, start a new set of processes
+                logging.warning(f'{self.__class__.__name__} OCR process stopped unexpectedly, restarting the OCR processes')
+                self.__executor.shutdown(wait=False, cancel_futures=True)
+                self.__executor = None
+                self.start()
+                future = self.__executor.submit(_read_frame, *args)
+        except:
+            self.__release(index)
+            raise
+        future.add_done_callback(lambda f: self.__release(index))
+        return future
+
+    def end(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True, cancel_futures=True)
+            self.__executor = None
+        with self.__lock:
+            for slot in self.__slots:
+                if slot is not None:
+                    slot.close()
+                    slot.unlink()
+            self.__slots = [None] * len(self.__slots)
+            self.__busy = [False] * len(self.__slots)
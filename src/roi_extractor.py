@@ -0,0 +1,83 @@
+import math
+import cv2
+import numpy as np
+
+
+class RoiRegion:
+    """
+    Where an ROI is in the screenshot, worked out once from its state ({'pos': [x, y],
+    'size': [w, h], 'angle': a}) and reused until the ROI is moved, resized or rotated.
+
+    Unrotated ROI's are an integer slice of the screenshot, rotated ROI's are resampled
+    with an affine map, the same as pyqtgraph's getArrayRegion did.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        x, y, w, h, angle = key
+        self.width = math.ceil(abs(w))
+        self.height = math.ceil(abs(h))
+        self.rotated = angle % 360 != 0
+        if self.rotated:
+            # Maps a pixel of the ROI to the screenshot, ROI's are rotated around their pos
+            radians = math.radians(angle)
+            cos = math.cos(radians)
+            sin = math.sin(radians)
+            self.matrix = np.array([[cos, -sin, x], [sin, cos, y]], dtype=np.float64)
+            self.left = x
+            self.top = y
+        else:
+            # getArrayRegion interpolated between pixels, the nearest pixel is near enough for OCR
+            self.left = math.floor(x + 0.5)
+            self.top = math.floor(y + 0.5)
+
+    @staticmethod
+    def key_of(state):
+        pos = state['pos']
+        size = state['size']
+        return float(pos[0]), float(pos[1]), float(size[0]), float(size[1]), float(state.get('angle', 0))
+
+    def extract(self, image, offset=(0, 0)):
+        """The ROI's pixels from image, captured at offset. A view of image where possible, parts of the ROI outside image are 0."""
+        if self.rotated:
+            matrix = self.matrix.copy()
+            matrix[0, 2] = self.left - offset[0]
+            matrix[1, 2] = self.top - offset[1]
+            return cv2.warpAffine(image, matrix, (self.width, self.height),
+                                  flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                                  borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        left = self.left - offset[0]
+        top = self.top - offset[1]
+        right = left + self.width
+        bottom = top + self.height
+        image_height, image_width = image.shape[:2]
+        if left >= 0 and top >= 0 and right <= image_width and bottom <= image_height:
+            return image[top:bottom, left:right]
+        region = np.zeros((self.height, self.width) + image.shape[2:], dtype=image.dtype)
+        src_left, src_top = max(left, 0), max(top, 0)
+        src_right, src_bottom = min(right, image_width), min(bottom, image_height)
+        if src_left < src_right and src_top < src_bottom:
+            region[src_top - top:src_bottom - top, src_left - left:src_right - left] = \
+                image[src_top:src_bottom, src_left:src_right]
+        return region
+
+
+class RoiExtractor:
+    """Cuts the ROI's out of each screenshot, keeping a RoiRegion per ROI until its state changes."""
+
+    def __init__(self):
+        self.__regions = {}
+
+    def region(self, roi, state):
+        key = RoiRegion.key_of(state)
+        region = self.__regions.get(roi)
+        if region is None or region.key != key:
+            region = RoiRegion(key)
+            self.__regions[roi] = region
+        return region
+
+    def extract(self, roi, state, image, offset=(0, 0)):
+        return self.region(roi, state).extract(image, offset)
+
+    def clear(self):
+        self.__regions = {}
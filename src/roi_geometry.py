@@ -0,0 +1,44 @@
+import math
+
+
+def roi_corners(state):
+    """
+    Corners of a saved ROI state ({'pos': [x, y], 'size': [w, h], 'angle': a}) in image coordinates,
+    ROI's are rotated around their pos.
+    """
+    x, y = state['pos']
+    w, h = state['size']
+    angle = math.radians(state.get('angle', 0))
+    cos = math.cos(angle)
+    sin = math.sin(angle)
+    return [(x + px * cos - py * sin, y + px * sin + py * cos) for px, py in ((0, 0), (w, 0), (0, h), (w, h))]
+
+
+def roi_bounds(state, width=None, height=None):
+    """
+    Integer (left, top, right, bottom) bounding box of a saved ROI state,
+    clipped to the image if the image width and height are specified.
+    """
+    corners = roi_corners(state)
+    left = math.floor(min(corner[0] for corner in corners))
+    top = math.floor(min(corner[1] for corner in corners))
+    right = math.ceil(max(corner[0] for corner in corners))
+    bottom = math.ceil(max(corner[1] for corner in corners))
+    if width is not None and height is not None:
+        left, right = min(max(left, 0), width), min(max(right, 0), width)
+        top, bottom = min(max(top, 0), height), min(max(bottom, 0), height)
+    return left, top, right, bottom
+
+
+def union_bounds(states, width=None, height=None):
+    """
+    Integer (left, top, right, bottom) bounding box containing all the saved ROI states,
+    returns None if there are no ROI's.
+    """
+    bounds = [roi_bounds(state, width, height) for state in states]
+    if len(bounds) <= 0:
+        return None
+    return (min(bound[0] for bound in bounds),
+            min(bound[1] for bound in bounds),
+            max(bound[2] for bound in bounds),
+            max(bound[3] for bound in bounds))
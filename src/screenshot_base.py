@@ -1,155 +1,204 @@
 import logging
-import os
-import cv2
 import numpy as np
-import pyqtgraph as pg
-import tesserocr
-from PIL import Image, ImageOps
-from pyqtgraph import ViewBox
-from src.ball_data import BallData, BallMetrics
-from src.labeled_roi import LabeledROI
-from src.settings import LaunchMonitor
+from src.change_detector import ChangeDetector
+from src.frame_reader import FrameReader, FrameReaderOptions
+from src.frame_ring import FrameRing
+from src.launch_monitor_profile import LaunchMonitorProfiles
+from src.roi_geometry import union_bounds
+from src.settle_detector import SettleDetector
+from src.shot_timing import ShotTiming
 
 
-class ScreenshotBase(ViewBox):
+class ScreenshotBase:
+    """
+    Captures the mirror app and OCR's its ROI's, no Qt objects are used so it can run
+    on any thread or process. A ScreenshotViewer can be attached to show the frames
+    and edit the ROI's, it is only sent frames while attached.
+    """
 
-    roi_color = "blue"
-    roi_pen_width = 2
     roi_size_factor = 0.2
 
-    def __init__(self, *args, **kwargs):
-        ViewBox.__init__(self, *args, **kwargs)
-        pg.setConfigOptions(imageAxisOrder='row-major')
+    def __init__(self):
         self.selected_club = None
         self.resize_window = False
         self.screenshot_new = False
-        self.image_rois = {}
+        self.screenshot_changed = False
+        self.rois = {}
         self.image_width = 0
         self.image_height = 0
         self.first = True
-        self.mirror_window = None
+        # Cleared once a frame is read, or sent to an OCR process, the first shot is only known once it has been read
+        self.first_frame = True
         self.screenshot_image = np.empty([2, 2])
-        self.screenshot_image_of_window = None
-        self.previous_screenshot_image = None
+        self.screenshot_offset = (0, 0)
+        self.rois_bounds = None
+        self.capture_source = None
+        self.frame_ring = FrameRing()
+        self.screenshot_index = None
+        self.previous_screenshot_index = None
         self.new_shot = False
         self.previous_balldata = None
+        self.profile = None
+        self.profile_launch_monitor = None
         self.previous_balldata_error = None
         self.balldata = None
-        self.__setupUi()
-        self.setAspectLocked(True)
-        self.setMenuEnabled(False)
-        self.invertY(True)
-
-    def __setupUi(self):
-        self.image_item = pg.ImageItem(None)
-        self.addItem(self.image_item)
+        self.viewer = None
+        self.frame_reader = FrameReader()
+        self.tesserocr_pool = self.frame_reader.tesserocr_pool
+        self.tesserocr_thread_pool = self.frame_reader.tesserocr_thread_pool
+        self.change_detector = ChangeDetector()
+        self.settle_detector = SettleDetector()
+        # Time taken by each stage for the last screenshot
+        self.timing = ShotTiming()
         self.__create_rois()
 
+    def attach_viewer(self, viewer):
+        self.viewer = viewer
+        viewer.rois_changed(self.get_rois())
+        if self.screenshot_index is not None:
+            viewer.frame_changed(self.screenshot_image, self.screenshot_offset)
+
+    def detach_viewer(self):
+        self.viewer = None
+
     def image(self):
-        self.image_item.setImage(self.screenshot_image)
-        #self.setLimits(xMin=0, xMax=self.image_item.width(), yMin=0, yMax=self.image_item.height())
-        self.setRange(xRange=[0, self.image_item.width()], yRange=[0, self.image_item.height()])
-        self.image_width = self.image_item.width()
-        self.image_height = self.image_item.height()
+        self.image_height, self.image_width = self.screenshot_image.shape[:2]
+        if self.viewer is not None:
+            self.viewer.frame_changed(self.screenshot_image, self.screenshot_offset)
 
     def update_rois(self, rois):
-        if len(self.image_rois) > 0 and len(rois) > 0:
+        if len(self.rois) > 0 and len(rois) > 0:
             for roi in self.rois_properties():
                 if roi in rois and len(rois[roi]) > 0:
-                    self.image_rois[roi].setState(rois[roi])
+                    self.rois[roi] = ScreenshotBase.__roi_state(rois[roi])
+            self.rois_bounds = union_bounds(self.rois.values())
+            if self.viewer is not None:
+                self.viewer.rois_changed(self.get_rois())
         else:
             self.__self_reset_rois()
+            self.rois_bounds = None
+
+    def update_roi(self, roi, state):
+        # An ROI moved in the viewer
+        self.rois[roi] = ScreenshotBase.__roi_state(state)
+        self.rois_bounds = union_bounds(self.rois.values())
+
+    @staticmethod
+    def __roi_state(state):
+        return {
+            'pos': [state['pos'][0], state['pos'][1]],
+            'size': [state['size'][0], state['size'][1]],
+            'angle': state.get('angle', 0)
+        }
+
+    def capture_region(self, rois_setup):
+        # The ROI editor needs the whole window, otherwise only the pixels covered by the ROI's are captured
+        if rois_setup:
+            return None
+        return self.rois_bounds
+
+    def set_screenshot(self, screenshot_image, offset, frame_size=None):
+        if self.previous_screenshot_index is not None and self.frame_ring.shape != screenshot_image.shape:
+            # Captured region changed, nothing to compare against
+            self.clear_previous_screenshot()
+        # Copy the capture into a reused frame buffer, screenshot_image holds the reference
+        # acquire() took until the next frame replaces it. Buffers of another shape are
+        # dropped along with their references when the new ones are allocated
+        replaced = self.screenshot_index if self.frame_ring.shape == screenshot_image.shape else None
+        index = self.frame_ring.acquire(screenshot_image.shape)
+        np.copyto(self.frame_ring.buffer(index), screenshot_image)
+        self.frame_ring.release(replaced)
+        self.screenshot_image = self.frame_ring.view(index, retain=False)
+        self.screenshot_index = index
+        self.screenshot_offset = offset
+        # Only look for screen changes where the ROI's are
+        if self.rois_bounds is None:
+            self.change_detector.set_region(None, frame_size)
+        else:
+            left, top = offset
+            self.change_detector.set_region((
+                self.rois_bounds[0] - left,
+                self.rois_bounds[1] - top,
+                self.rois_bounds[2] - left,
+                self.rois_bounds[3] - top), frame_size)
+
+    def launch_monitor_profile(self):
+        # Only looked up again if the launch monitor is changed in the settings
+        if self.profile is None or self.profile_launch_monitor != self.settings.device_id:
+            self.profile = LaunchMonitorProfiles.get(self.settings.device_id)
+            self.profile_launch_monitor = self.settings.device_id
+        return self.profile
 
     def rois_properties(self):
-        logging.debug(f"self.__class__.__name__: {self.__class__.__name__}")
-        if self.__class__.__name__ == 'ScreenshotExPutt':
-            logging.debug(f'ScreenshotExPutt')
-            rois_properties = BallData.rois_putting_properties
-            BallData.properties[BallMetrics.HLA] = "Launch Dir"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Putter path"
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = "Impact Angle"
-        elif self.settings.device_id == LaunchMonitor.UNEEKOR or self.settings.device_id == LaunchMonitor.UNEEKOR_IPAD :
-            rois_properties = BallData.rois_uneekor_properties
-            BallData.properties[BallMetrics.VLA] = "Launch Angle"
-            BallData.properties[BallMetrics.HLA] = "Side Angle"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Club path"
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = "Attack Angle"
-        elif self.settings.device_id ==  LaunchMonitor.MEVOPLUS :
-            rois_properties = BallData.rois_mevoplus_properties
-            BallData.properties[BallMetrics.VLA] = "Launch V"
-            BallData.properties[BallMetrics.HLA] = "Launch H"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Club path"
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = 'AOA'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = 'Face to target'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_PATH] = 'Face to path'
-        elif self.settings.device_id ==  LaunchMonitor.R50:
-            rois_properties = BallData.rois_r50_properties
-            BallData.properties[BallMetrics.HLA] = "Launch Direction"
-            BallData.properties[BallMetrics.VLA] = "Launch Angle"
-            BallData.properties[BallMetrics.CLUB_PATH] = "Club path"
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = "Attack Angle"
-            BallData.properties[BallMetrics.CLUB_FACE_TO_PATH] = 'Face to Path'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = 'Club Face'
-        elif self.settings.device_id ==  LaunchMonitor.SKYTRAKPLUS :
-            rois_properties = BallData.rois_skytrak_properties
-            BallData.properties[BallMetrics.VLA] = "Launch Angle"
-            BallData.properties[BallMetrics.HLA] = "Side Angle"
-            BallData.properties[BallMetrics.CLUB_PATH] = 'Club path'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = 'Face to target'
-            BallData.properties[BallMetrics.CLUB_FACE_TO_PATH] = 'Face to path'
-        else : # defaults
-            rois_properties = BallData.rois_properties
-            BallData.properties[BallMetrics.HLA] = "Launch Direction (HLA)"
-            BallData.properties[BallMetrics.VLA] = "Launch Angle (VLA)"
-            BallData.properties[BallMetrics.CLUB_PATH] = 'Club path'
-            BallData.properties[BallMetrics.ANGLE_OF_ATTACK] = "Angle of Attack"
-            BallData.properties[BallMetrics.CLUB_FACE_TO_TARGET] = 'Impact Angle'
-        
-        return rois_properties
+        return self.launch_monitor_profile().rois
+
+    def __default_roi(self):
+        return {
+            "pos": [0, 0],
+            "size": [self.image_width * ScreenshotBase.roi_size_factor, self.image_height * ScreenshotBase.roi_size_factor],
+            "angle": 0
+        }
 
     def __create_rois(self):
-        if len(self.image_rois) <= 0:
-            for roi in self.rois_properties():
-                self.image_rois[roi] = LabeledROI(
-                    [0, 0], [self.image_width * ScreenshotBase.roi_size_factor, self.image_height * ScreenshotBase.roi_size_factor],
-                    pen=({'color': ScreenshotBase.roi_color, 'width': ScreenshotBase.roi_pen_width}),
-                    label=BallData.properties[roi])
-                self.addItem(self.image_rois[roi])
+        if len(self.rois) <= 0:
+            for roi in self.launch_monitor_profile().rois:
+                self.rois[roi] = self.__default_roi()
 
     def __self_reset_rois(self):
         rois = {}
         for roi in self.rois_properties():
-            rois[roi] = {
-                "pos": [0, 0],
-                "size": [self.image_width * ScreenshotBase.roi_size_factor, self.image_height * ScreenshotBase.roi_size_factor],
-                "angle": 0
-            }
+            rois[roi] = self.__default_roi()
         self.update_rois(rois)
 
     def get_rois(self):
         rois = {}
-        if not self.image_rois is None:
-            for roi in self.image_rois:
-                rois[roi] = self.image_rois[roi].saveState()
+        for roi in self.rois:
+            rois[roi] = ScreenshotBase.__roi_state(self.rois[roi])
         return rois
 
-    def zoom(self, in_or_out):
+    def previous_screenshot(self):
+        if self.previous_screenshot_index is None:
+            return None
+        return self.frame_ring.buffer(self.previous_screenshot_index)
+
+    def keep_previous_screenshot(self):
+        # The current frame becomes the one later frames are compared against
+        self.frame_ring.retain(self.screenshot_index)
+        self.frame_ring.release(self.previous_screenshot_index)
+        self.previous_screenshot_index = self.screenshot_index
+
+    def clear_previous_screenshot(self):
+        self.frame_ring.release(self.previous_screenshot_index)
+        self.previous_screenshot_index = None
+        self.settle_detector.reset()
+
+    def screen_changed(self, mse, mse_min):
         """
-        see ViewBox.scaleBy()
-        pyqtgraph wheel zoom is s = ~0.75
+        Sets screenshot_new if the screenshot should be read. A changed screenshot becomes the
+        one later screenshots are compared against, it is read once the screen has settled.
         """
-        s = 0.9
-        zoom = (s, s) if in_or_out == "in" else (1 / s, 1 / s)
-        self.scaleBy(zoom)
+        profile = self.launch_monitor_profile()
+        self.settle_detector.configure(profile.settle_frames, profile.settle_ms)
+        # Until the first screenshot is read it is treated as changed, unless waiting for it to settle
+        self.screenshot_changed = mse >= mse_min or (self.first_frame and not self.settle_detector.settling)
+        if self.screenshot_changed:
+            self.keep_previous_screenshot()
+            self.image()
+            self.timing.mark('display')
+            self.screenshot_new = self.settle_detector.changed()
+            if self.screenshot_new:
+                self.first_frame = False
+        else:
+            self.screenshot_new = self.settle_detector.unchanged()
+        return self.screenshot_changed
+
+    def end_ocr(self):
+        self.frame_reader.end()
 
     def mse(self, imageA, imageB):
         err = 0
         try:
-            # the 'Mean Squared Error' between the two images is the
-            # sum of the squared difference between the two images;
-            # NOTE: the two images must have the same dimension
-            err = np.sum((imageA.astype("float") - imageB.astype("float")) ** 2)
-            err /= float(imageA.shape[0] * imageA.shape[1])
+            err = self.change_detector.mse(imageA, imageB)
         except:
             # If error force new screenshot
             err = 10
@@ -157,150 +206,67 @@ class ScreenshotBase(ViewBox):
         # the two images are
         return err
 
+    def frame_reader_options(self):
+        return FrameReaderOptions.from_settings(self.settings)
+
     def ocr_image(self):
-        self.balldata = BallData()
-        self.balldata.club = self.selected_club
         self.new_shot = False
-        fallback_tesserocr_api = None
-        if self.__class__.__name__ == 'ScreenshotExPutt':
-            train_file = 'exputt'
-        else:
-            self.balldata.launch_monitor = self.settings.device_id
-            train_file = 'train'
-            if self.settings.device_id == LaunchMonitor.MEVOPLUS:
-                train_file = 'mevo'
-            elif self.settings.device_id == LaunchMonitor.FSKIT:
-                train_file = 'fskit'
-            elif self.settings.device_id == LaunchMonitor.R50:
-                train_file = 'r50'
-            elif self.settings.device_id == LaunchMonitor.TRACKMAN:
-                train_file = 'trackman'
-            elif self.settings.device_id == LaunchMonitor.TRUGOLF_APOGEE:
-                train_file = 'apex'
-            elif self.settings.device_id == LaunchMonitor.TRUGOLF_APOGEE_AID:
-                train_file = 'apex_aid'
-            elif self.settings.device_id == LaunchMonitor.UNEEKOR:
-                train_file = 'uneekor'
-            elif self.settings.device_id == LaunchMonitor.UNEEKOR_IPAD:
-                train_file = 'uneekor_ipad'
-            elif self.settings.device_id == LaunchMonitor.SKYTRAKPLUS:
-                train_file = 'skytrak'
-            elif self.settings.device_id == LaunchMonitor.XSWINGPRO:
-                train_file = 'xswingpro'
-            elif self.settings.device_id == LaunchMonitor.SQUARE:
-                train_file = 'square'
-            elif self.settings.device_id == LaunchMonitor.SC4:
-                train_file = 'voicecaddiesc4'
+        balldata = self.frame_reader.read(
+            self.screenshot_image, self.screenshot_offset, self.rois, self.launch_monitor_profile(),
+            self.frame_reader_options(), self.selected_club, self.timing, self.previous_balldata)
+        self.process_balldata(balldata)
 
-        logging.debug(f"Using {train_file}.traineddata for OCR")
-        tesserocr_api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_WORD, lang=train_file, path='.\\')
-        try:
-            pil_img = Image.fromarray(self.screenshot_image).convert('RGB')
-            sc = np.array(pil_img)
-            for roi in self.rois_properties():
-                cropped_img = self.image_rois[roi].getArrayRegion(sc, self.image_item)
-                if self.__class__.__name__ != 'ScreenshotExPutt' and self.settings.device_id == LaunchMonitor.MLM2PRO and self.settings.zoom_images == "Yes":
-                    logging.debug(f'ocr {roi} - zoom image')
-                    original_height, original_width = cropped_img.shape[:2]
-                    #print(f"width: {original_width} height: {original_height}")
-                    cropped_img = cv2.resize(cropped_img,
-                                               (int(original_height * 6), int(original_width * 2)),
-                                               interpolation=cv2.INTER_LINEAR)
-                # Create PIL image and convert to grey scale
-                img = Image.fromarray(np.uint8(cropped_img)).convert('L')
-                #width, height = img.size
-                #img = img.resize(int(width * factor), int(height * factor))
-                if self.__class__.__name__ != 'ScreenshotExPutt' and self.settings.device_id == LaunchMonitor.MLM2PRO:
-                    # Convert to black text on white background, remove background
-                    threshold = self.settings.colour_threshold
-                    logging.debug(f'ocr {roi} - using threshold: {threshold}')
-                    img = img.point(lambda x: 0 if x > threshold else 255)
-                    #filename = time.strftime(f"{roi}_%Y%m%d-%H%M%S.bmp")
-                    #filename = time.strftime(f"{roi}.bmp")
-                    #path = f"{os.getcwd()}\\appdata\\logs\\original_{filename}"
-                    #img.save(path)
-                    bbox = ImageOps.invert(img).getbbox()
-                    bbox = img.point(lambda x: 255 - x).getbbox()
-                    logging.debug(f'ocr {roi} - bounding box for white space removal: {bbox}')
-                    bbox1 = []
-                    if bbox is not None:
-                        for i in range(len(bbox)):
-                            if (i == 0 or i == 1) and bbox[i] > 0: # left & upper
-                                new_value = bbox[i] - 5
-                                if new_value > 0:
-                                    bbox1.append(new_value)
-                                else:
-                                    bbox1.append(0)
-                            elif (i == 2 or i == 3): # right & lower
-                                bbox1.append(bbox[i] + 5)
-                            else:
-                                bbox1.append(bbox[i])
-                        logging.debug(f'ocr {roi} - modified bounding box with a small amount of white space added: {bbox1}')
-                        img = img.crop(bbox1)
-                    if self.settings.create_debug_images == 'Yes':
-                        filename = f"{roi}.bmp"
-                        path = f"{os.getcwd()}\\appdata\\logs\\{filename}"
-                        img.save(path)
-                tesserocr_api.SetImage(img)
-                ocr_result = tesserocr_api.GetUTF8Text()
-                conf = tesserocr_api.MeanTextConf()
-                logging.debug(f'ocr {roi} - confidence: {conf} result: {ocr_result.strip()}')
-                if conf <= 0:
-                    logging.debug(f'ocr {roi} confidence <= 0 retrying with RAW_LINE')
-                    if fallback_tesserocr_api is None:
-                        fallback_tesserocr_api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.RAW_LINE, lang=train_file, path='.\\')
-                    fallback_tesserocr_api.SetImage(img)
-                    ocr_result = fallback_tesserocr_api.GetUTF8Text()
-                    conf = fallback_tesserocr_api.MeanTextConf()
-                    logging.debug(f'fallback ocr {roi} - confidence: {conf} result: {ocr_result}')
-                if self.__class__.__name__ == 'ScreenshotExPutt':
-                    self.balldata.process_putt_data(ocr_result, roi, self.previous_balldata)
-                else:
-                    self.balldata.process_shot_data(ocr_result, roi, self.previous_balldata, self.selected_club, self.settings.mevo_plus['offline_mode'])
+    def submit_ocr(self, ocr_pool):
+        """Read the frame in an OCR process, returns a future for its BallData or None if the OCR processes are busy."""
+        return ocr_pool.submit(
+            self.screenshot_image, self.screenshot_offset, self.get_rois(), self.launch_monitor_profile().name,
+            self.frame_reader_options(), self.selected_club, self.timing)
 
-            # Correct metrics if invalid smash factor
-            if self.balldata.putt_type is None:
-                self.balldata.check_smash_factor(self.selected_club)
+    def process_balldata(self, balldata):
+        """Decide whether the metrics read from a frame are a new shot, a repeat of the last one or a misread."""
+        self.balldata = balldata
+        self.new_shot = False
+        # Correct metrics if invalid smash factor
+        if self.balldata.putt_type is None:
+            self.balldata.check_smash_factor(self.balldata.club)
 
-            # Ignore first shot at startup
-            if self.first:
-                logging.debug('First shot, ignoring')
-                self.first = False
-                self.previous_balldata = self.balldata.__copy__()
+        # Ignore first shot at startup
+        if self.first:
+            logging.debug('First shot, ignoring')
+            self.first = False
+            self.previous_balldata = self.balldata.__copy__()
 
-            if not self.previous_balldata is None:
-                diff_count = self.balldata.eq(self.previous_balldata)
-            else:
-                diff_count = 1
-            self.new_shot = diff_count > 0
-            if self.new_shot:
-                if len(self.balldata.errors) > 0:
-                    self.balldata.good_shot = False
-                    if not self.previous_balldata_error is None and self.balldata.eq(self.previous_balldata_error) <= 1:
-                        # Duplicate error ignore
-                        self.new_shot = False
-                    else:
-                        # New error
-                        self.previous_balldata_error = self.balldata.__copy__()
-                        self.resize_window = True
-                    logging.debug('Errors found in shot data')
-                    #filename = time.strftime("%Y%m%d-%H%M%S.jpeg")
-                    #path = f"{os.getcwd()}\\appdata\\logs\\{filename}"
-                    #im = Image.fromarray(self.screenshot_image)
-                    #im.save(path)
+        if not self.previous_balldata is None:
+            diff_count = self.balldata.eq(self.previous_balldata)
+        else:
+            diff_count = 1
+        self.new_shot = diff_count > 0
+        if self.new_shot:
+            if len(self.balldata.errors) > 0:
+                self.balldata.good_shot = False
+                if not self.previous_balldata_error is None and self.balldata.eq(self.previous_balldata_error) <= 1:
+                    # Duplicate error ignore
+                    self.new_shot = False
                 else:
-                    if self.balldata.putt_type is None and not self.previous_balldata is None and diff_count <= 1:
-                        # If there is only 1 metric different then it's likely this is not a new shot
-                        # for example if rapsodo times out or someone changes clubs on the rapsodo
-                        self.new_shot = False
-                        logging.debug('Only 1 metric different from previous shot, probably not a new shot, ignoring')
-                    else:
-                        # Good shot
-                        logging.debug(f'New valid shot, data: {self.balldata.to_json()}')
-                        self.balldata.good_shot = True
-                        self.previous_balldata = self.balldata.__copy__()
+                    # New error
+                    self.previous_balldata_error = self.balldata.__copy__()
+                    self.resize_window = True
+                logging.debug('Errors found in shot data')
+                #filename = time.strftime("%Y%m%d-%H%M%S.jpeg")
+                #path = f"{os.getcwd()}\\appdata\\logs\\{filename}"
+                #im = Image.fromarray(self.screenshot_image)
+                #im.save(path)
             else:
-                logging.debug('Not a new shot')
-        finally:
-            tesserocr_api.End()
-
+                if self.balldata.putt_type is None and not self.previous_balldata is None and diff_count <= 1:
+                    # If there is only 1 metric different then it's likely this is not a new shot
+                    # for example if rapsodo times out or someone changes clubs on the rapsodo
+                    self.new_shot = False
+                    logging.debug('Only 1 metric different from previous shot, probably not a new shot, ignoring')
+                else:
+                    # Good shot
+                    logging.debug(f'New valid shot, data: {self.balldata.to_json()}')
+                    self.balldata.good_shot = True
+                    self.previous_balldata = self.balldata.__copy__()
+        else:
+            logging.debug('Not a new shot')
+        self.balldata.timing.mark('validation')
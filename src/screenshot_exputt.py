@@ -1,81 +1,74 @@
 import logging
 from threading import Event
-from src.ctype_screenshot import ScreenMirrorWindow, ScreenshotOfWindow
+from src.capture_source import CaptureSource
 from src.custom_exception import CameraWindowNotFoundException
+from src.launch_monitor_profile import LaunchMonitorProfiles
 from src.screenshot_base import ScreenshotBase
 from src.settings import Settings
+from src.shot_timing import ShotTiming
 
 
 class ScreenshotExPutt(ScreenshotBase):
 
-    def __init__(self, settings: Settings, *args, **kwargs):
-        ScreenshotBase.__init__(self, *args, **kwargs)
+    def __init__(self, settings: Settings, capture_source: CaptureSource = None):
+        ScreenshotBase.__init__(self)
         self.settings = settings
+        if capture_source is None:
+            # Win32 only, imported here so file and video capture sources can be used on any platform
+            from src.capture_source_window import WindowCaptureSource
+            capture_source = WindowCaptureSource()
+        self.capture_source = capture_source
+
+    def launch_monitor_profile(self):
+        return LaunchMonitorProfiles.exputt
 
     def capture_screenshot(self, settings, rois_setup=False):
-        # Check if window minimized, for some reason it has a different hwnd when minimized
-        # so check here first and restore
-        if self.mirror_window and self.mirror_window.is_minimized():
-                # Restore the window
-                self.mirror_window.restore()
-        # Find the window using window title in case a new one was started
+        self.timing = ShotTiming()
         try:
-            hwnd = ScreenMirrorWindow.find_window(settings.exputt['window_name'])
+            self.capture_source.open(settings.exputt['window_name'])
         except Exception as e:
             raise CameraWindowNotFoundException(format(e))
-        if self.mirror_window is None or hwnd != self.mirror_window.hwnd:
-            self.mirror_window = ScreenMirrorWindow(settings.exputt['window_name'])
-            self.screenshot_image_of_window = ScreenshotOfWindow(
-                hwnd=self.mirror_window.hwnd,
-                client=True,
-                ascontiguousarray=True)
-        # Make sure window is not minimized
-        if self.mirror_window.is_minimized():
-            self.mirror_window.restore()
-        # Resize to correct size if required
-        window_size = self.mirror_window.size()
-        if self.resize_window or window_size['h'] != settings.height() or window_size['w'] != settings.width():
-            logging.debug('Resize screen mirror window')
-            # self.previous_screenshot_image = None
-            if settings.width() <= 0 or settings.height() <= 0:
-                # Obtain current window rect
-                settings.exputt['window_rect'] = {
-                    'left': self.mirror_window.rect.left,
-                    'top': self.mirror_window.rect.top,
-                    'right': self.mirror_window.rect.right,
-                    'bottom': self.mirror_window.rect.bottom
-                }
-                # Write values to settings file
-                if not rois_setup:
-                    settings.save()
-                logging.debug(f'No previously saved window dimensions found, saving current window dimentions to config file: {settings.exputt["window_rect"]}')
-            else:
-                # Resize window to correct size
-                self.mirror_window.resize(
-                    settings.width(),
-                    settings.height())
-                # Give window time to resize before taking screenshot
-                Event().wait(0.25)
-                logging.debug(f'Loading window dimensions from config file: {settings.exputt["window_rect"]}')
-            self.resize_window = False
+        if self.capture_source.resizable:
+            # Make sure window is not minimized
+            if self.capture_source.is_minimized():
+                self.capture_source.restore()
+            # Resize to correct size if required
+            window_size = self.capture_source.size()
+            if self.resize_window or window_size['h'] != settings.height() or window_size['w'] != settings.width():
+                logging.debug('Resize screen mirror window')
+                # self.clear_previous_screenshot()
+                if settings.width() <= 0 or settings.height() <= 0:
+                    # Obtain current window rect
+                    settings.exputt['window_rect'] = self.capture_source.rect()
+                    # Write values to settings file
+                    if not rois_setup:
+                        settings.save()
+                    logging.debug(f'No previously saved window dimensions found, saving current window dimentions to config file: {settings.exputt["window_rect"]}')
+                else:
+                    # Resize window to correct size
+                    self.capture_source.resize(
+                        settings.width(),
+                        settings.height())
+                    # Give window time to resize before taking screenshot
+                    Event().wait(0.25)
+                    logging.debug(f'Loading window dimensions from config file: {settings.exputt["window_rect"]}')
+                self.resize_window = False
         # Take screenshot
-        self.screenshot_image = self.screenshot_image_of_window.screenshot_window()
-        #im = Image.fromarray(self.screenshot_image)
-        #im.save("c:\\python\\test\\putt.jpeg")
+        screenshot_image, offset = self.capture_source.capture(self.capture_region(rois_setup), copy=False)
+        self.set_screenshot(screenshot_image, offset, self.capture_source.captured_size)
+        self.timing.mark('capture')
 
         # Check if new shot
         self.new_shot = False
         self.screenshot_new = False
-        mse_min = 400
+        mse_min = self.launch_monitor_profile().mse_min
         mse = mse_min
 
-        if not self.previous_screenshot_image is None:
-            mse = self.mse(self.previous_screenshot_image, self.screenshot_image)
+        if not self.previous_screenshot_index is None:
+            mse = self.mse(self.previous_screenshot(), self.screenshot_image)
+        self.timing.mark('mse')
 
-        if mse >= mse_min:
-            self.screenshot_new = True
-            self.previous_screenshot_image = self.screenshot_image
-            self.image()
+        if self.screen_changed(mse, mse_min):
             logging.debug(f'Exputt screenshot different mse: {mse}')
         # To reset roi values pass in device without rois
         if rois_setup or len(settings.exputt['rois']) <= 0:
@@ -0,0 +1,86 @@
+from functools import partial
+import pyqtgraph as pg
+from PySide6.QtCore import Signal
+from pyqtgraph import ViewBox
+from src.labeled_roi import LabeledROI
+
+
+class ScreenshotViewer(ViewBox):
+    """
+    Shows the frames captured by a Screenshot and lets the user move its ROI's.
+
+    The screenshot only sends frames while the viewer is attached to it, they can
+    come from any thread and are shown on the GUI thread.
+    """
+
+    roi_color = "blue"
+    roi_pen_width = 2
+
+    frame_received = Signal(object, object)
+    rois_received = Signal(object)
+
+    def __init__(self, *args, **kwargs):
+        ViewBox.__init__(self, *args, **kwargs)
+        pg.setConfigOptions(imageAxisOrder='row-major')
+        self.screenshot = None
+        self.image_rois = {}
+        self.image_item = pg.ImageItem(None)
+        self.addItem(self.image_item)
+        self.frame_received.connect(self.__show_frame)
+        self.rois_received.connect(self.__show_rois)
+        self.setAspectLocked(True)
+        self.setMenuEnabled(False)
+        self.invertY(True)
+
+    def attach(self, screenshot):
+        self.detach()
+        self.screenshot = screenshot
+        screenshot.attach_viewer(self)
+
+    def detach(self):
+        if self.screenshot is not None:
+            self.screenshot.detach_viewer()
+            self.screenshot = None
+
+    def frame_changed(self, image, offset):
+        # The screenshot reuses its frame buffers so the viewer needs its own copy
+        self.frame_received.emit(image.copy(), offset)
+
+    def rois_changed(self, rois):
+        self.rois_received.emit(rois)
+
+    def __show_frame(self, image, offset):
+        self.image_item.setImage(image)
+        # Place a partial screenshot where it was captured so the ROI's still line up
+        left, top = offset
+        self.image_item.setPos(left, top)
+        self.setRange(xRange=[left, left + self.image_item.width()], yRange=[top, top + self.image_item.height()])
+
+    def __show_rois(self, rois):
+        labels = self.screenshot.launch_monitor_profile().labels if self.screenshot is not None else {}
+        for roi in list(self.image_rois):
+            if roi not in rois:
+                self.removeItem(self.image_rois.pop(roi))
+        for roi, state in rois.items():
+            if roi in self.image_rois:
+                self.image_rois[roi].setState(state)
+            else:
+                self.image_rois[roi] = LabeledROI(
+                    state['pos'], state['size'], angle=state.get('angle', 0),
+                    pen=({'color': ScreenshotViewer.roi_color, 'width': ScreenshotViewer.roi_pen_width}),
+                    label=labels.get(roi))
+                self.image_rois[roi].sigRegionChangeFinished.connect(partial(self.__roi_moved, roi))
+                self.addItem(self.image_rois[roi])
+
+    def __roi_moved(self, roi, image_roi):
+        if self.screenshot is not None:
+            self.screenshot.update_roi(roi, image_roi.saveState())
+
+    def zoom(self, in_or_out):
+        """
+        see ViewBox.scaleBy()
+        pyqtgraph wheel zoom is s = ~0.75
+        """
+        s = 0.9
+        zoom = (s, s) if in_or_out == "in" else (1 / s, 1 / s)
+        self.scaleBy(zoom)
@@ -45,10 +45,13 @@ class Settings(SettingsBase):
                 "create_debug_images": "No",
                 "colour_threshold": 180,
                 "zoom_images": "No",
+                "parallel_ocr": "No",
+                "ocr_processes": 0,
                 "relay_server_ip_address": "127.0.0.1",
                 "relay_server_port": 9234,
                 'auto_start_all_apps': 'No',
-                'keep_log_history': 'No'
+                'keep_log_history': 'No',
+                'auto_reconnect': 'Yes'
             }
         )
         # Removed this from the settings file, specifies the
@@ -70,6 +73,12 @@ class Settings(SettingsBase):
         if not hasattr(self, 'zoom_images'):
             self.zoom_images = "No"
             save = True
+        if not hasattr(self, 'parallel_ocr'):
+            self.parallel_ocr = "No"
+            save = True
+        if not hasattr(self, 'ocr_processes'):
+            self.ocr_processes = 0
+            save = True
         if not hasattr(self, 'keep_log_history'):
             self.keep_log_history = "No"
             save = True
@@ -91,6 +100,9 @@ class Settings(SettingsBase):
                 value = 'Yes'
             self.auto_start_all_apps = value
             save = True
+        if not hasattr(self, 'auto_reconnect'):
+            self.auto_reconnect = 'Yes'
+            save = True
         if not hasattr(self, 'web_api'):
             self.web_api = {
                 "url": "https://mlm.rapsodo.com/api/simulator/user/",
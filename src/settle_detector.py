@@ -0,0 +1,76 @@
+import logging
+import time
+
+
+class SettleDetector:
+    """
+    Waits for the screen to stop changing after a change is detected before it is read.
+
+    Launch monitor apps animate the metrics in over several frames after a shot, each of
+    those frames is a change but only the last one needs to be OCR'd. The screen has
+    settled once it hasn't changed for frames screenshots and ms milliseconds, with both
+    0 every change is read straight away. A screen that never stops changing is read
+    every max_ms milliseconds.
+    """
+
+    max_ms = 2000
+
+    def __init__(self, frames=0, ms=0):
+        self.frames = frames
+        self.ms = ms
+        self.settling = False
+        self.stable_frames = 0
+        self.started_ns = None
+        self.changed_ns = None
+        # Changes read, and changes skipped while waiting for the screen to settle
+        self.settled = 0
+        self.saved = 0
+
+    def configure(self, frames, ms):
+        self.frames = frames
+        self.ms = ms
+
+    def changed(self, now_ns=None):
+        """The screen changed, returns True if it should be read now."""
+        if self.frames <= 0 and self.ms <= 0:
+            self.settled = self.settled + 1
+            return True
+        now_ns = now_ns if now_ns is not None else time.perf_counter_ns()
+        if self.settling:
+            # The change before this one won't be read
+            self.saved = self.saved + 1
+            if now_ns - self.started_ns >= SettleDetector.max_ms * 1e6:
+                logging.debug(f'{self.__class__.__name__} screen still changing after {SettleDetector.max_ms}ms, reading it')
+                return self.__settle()
+        else:
+            self.settling = True
+            self.started_ns = now_ns
+        self.stable_frames = 0
+        self.changed_ns = now_ns
+        return False
+
+    def unchanged(self, now_ns=None):
+        """The screen didn't change, returns True if it has just settled and should be read."""
+        if not self.settling:
+            return False
+        now_ns = now_ns if now_ns is not None else time.perf_counter_ns()
+        self.stable_frames = self.stable_frames + 1
+        if self.stable_frames >= self.frames and now_ns - self.changed_ns >= self.ms * 1e6:
+            logging.debug(f'{self.__class__.__name__} screen settled after {self.stable_frames} unchanged screenshots, {self.saved} OCR passes saved so far')
+            return self.__settle()
+        return False
+
+    def __settle(self):
+        self.settling = False
+        self.settled = self.settled + 1
+        return True
+
+    def reset(self):
+        self.settling = False
+        self.stable_frames = 0
+
+    def stats(self):
+        return {
+            'settled': self.settled,
+            'saved': self.saved
+        }
@@ -0,0 +1,184 @@
+import logging
+import math
+import re
+
+from src.ball_data import BallData, BallMetrics
+from src.launch_monitor_profile import LaunchMonitorProfile
+from src.settings import LaunchMonitor
+
+
+class ShotDataParser:
+    """
+    Converts the OCR text read from a launch monitor's ROI's into BallData metrics.
+
+    Everything that depends on the launch monitor, how directions are shown, launch
+    monitor specific corrections and where a metric is stored, is looked up in tables
+    built once for the launch monitor's profile. To support a new launch monitor add
+    it to the tables rather than branching in parse().
+    """
+
+    non_ascii = re.compile(r'[^\x00-\x7f]')
+    number = re.compile(r"[LR]?[-+]?(?:\d*\.*\d+)[LR]?")
+    wedges = ['PW', 'SW', 'GW', 'LW']
+    # Values above these limits are misreads with an extra digit
+    upper_limits = {
+        BallMetrics.SPEED: 200,
+        BallMetrics.TOTAL_SPIN: 13000,
+        BallMetrics.CLUB_SPEED: 140
+    }
+    # Metrics shown with a direction after the value, e.g. 2.5L, left is negative for GSPro
+    direction_suffix = {
+        LaunchMonitor.MEVOPLUS: [BallMetrics.HLA, BallMetrics.SPIN_AXIS, BallMetrics.CLUB_PATH,
+                                 BallMetrics.CLUB_FACE_TO_TARGET, BallMetrics.CLUB_FACE_TO_PATH,
+                                 BallMetrics.ANGLE_OF_ATTACK],
+        LaunchMonitor.R50: [BallMetrics.HLA, BallMetrics.SPIN_AXIS, BallMetrics.CLUB_PATH,
+                            BallMetrics.CLUB_FACE_TO_TARGET, BallMetrics.CLUB_FACE_TO_PATH,
+                            BallMetrics.ANGLE_OF_ATTACK],
+        LaunchMonitor.UNEEKOR: [BallMetrics.SIDE_SPIN, BallMetrics.CLUB_PATH, BallMetrics.HLA],
+        LaunchMonitor.XSWINGPRO: [BallMetrics.SIDE_SPIN, BallMetrics.CLUB_PATH, BallMetrics.HLA]
+    }
+    # Metrics shown with a direction before the value, e.g. L2.5
+    direction_prefix = {
+        LaunchMonitor.SQUARE: [BallMetrics.SPIN_AXIS, BallMetrics.HLA]
+    }
+    # Metric read from the spin axis ROI and whether it is reversed
+    spin_axis_target = {
+        LaunchMonitor.TRUGOLF_APOGEE: (BallMetrics.SIDE_SPIN, False),
+        LaunchMonitor.TRUGOLF_APOGEE_AID: (BallMetrics.SIDE_SPIN, True)
+    }
+
+    def __init__(self, profile: LaunchMonitorProfile):
+        self.profile = profile
+        self.launch_monitor = launch_monitor = profile.name
+        self.labels = profile.labels
+        self.conversions = {}
+        for roi in ShotDataParser.direction_suffix.get(launch_monitor, []):
+            self.conversions[roi] = ShotDataParser.__direction_suffix
+        for roi in ShotDataParser.direction_prefix.get(launch_monitor, []):
+            self.conversions[roi] = ShotDataParser.__direction_prefix
+        # Launch monitor specific corrections, applied to the value read before it is validated
+        corrections = {
+            LaunchMonitor.MEVOPLUS: {
+                BallMetrics.SPIN_AXIS: ShotDataParser.__mevo_offline_spin_axis,
+                BallMetrics.VLA: ShotDataParser.__mevo_chip_vla
+            },
+            LaunchMonitor.SC4: {
+                BallMetrics.TOTAL_SPIN: ShotDataParser.__sc4_wedge_default,
+                BallMetrics.VLA: ShotDataParser.__sc4_wedge_default
+            },
+            LaunchMonitor.SKYTRAKPLUS: {
+                BallMetrics.HLA: ShotDataParser.__skytrak_hla
+            }
+        }
+        self.corrections = corrections.get(launch_monitor, {})
+        self.must_not_be_zero = set(profile.must_not_be_zero)
+        self.targets = {}
+        if launch_monitor in ShotDataParser.spin_axis_target:
+            self.targets[BallMetrics.SPIN_AXIS] = ShotDataParser.spin_axis_target[launch_monitor]
+
+    @staticmethod
+    def __direction_suffix(result):
+        if len(result) > 1:
+            result = result.upper()
+            if result.endswith('L'):
+                return -float(result[:-1])
+            # The last character is dropped even if there is no direction
+            return float(result[:-1])
+        return float(result)
+
+    @staticmethod
+    def __direction_prefix(result):
+        if len(result) > 1:
+            result = result.upper()
+            if result.startswith('L'):
+                return -float(result[1:])
+            elif result.startswith('R'):
+                return float(result[1:])
+            # Without a direction the value is left as text, which then fails validation
+            return result
+        return float(result)
+
+    def __mevo_offline_spin_axis(self, ball_data, roi, result, selected_club, offline_mode):
+        if offline_mode == 'Yes':
+            old_result = result
+            result = float(result * 0.4)
+            logging.debug(f"{self.launch_monitor} is in offline mode, adjusting {self.labels[roi]} from: {old_result} to: {result}")
+        return result
+
+    def __mevo_chip_vla(self, ball_data, roi, result, selected_club, offline_mode):
+        if result == 0.5:  # this value of VLA is observed when MEVO+ failed to register a chip shot properly
+            raise ValueError(f"Detected problematic VLA = 0.5 for {self.launch_monitor}. Ignoring the shot")
+        return result
+
+    def __sc4_wedge_default(self, ball_data, roi, result, selected_club, offline_mode):
+        if result <= 0 and selected_club in ShotDataParser.wedges:
+            result = 5000 if roi == BallMetrics.TOTAL_SPIN else 36
+            logging.debug(
+                f"{self.launch_monitor} value read for {self.labels[roi]} is 0, changing value to: {result}")
+        return result
+
+    def __skytrak_hla(self, ball_data, roi, result, selected_club, offline_mode):
+        if result < -40 or result > 40:  # assume a misread, or the word "Center"
+            ball_data.corrections[roi] = True
+            result = 0
+        return result
+
+    def parse(self, ball_data: BallData, ocr_result: str, roi, selected_club, offline_mode):
+        """Set the metric for roi in ball_data from the OCR text, or record an error and set it to BallData.invalid_value."""
+        msg = None
+        result = ''
+        try:
+            # Strip non ascii chars and commas
+            if not ocr_result.isascii():
+                ocr_result = ShotDataParser.non_ascii.sub('', ocr_result)
+            ocr_result = ocr_result.replace(',', '')
+            match = ShotDataParser.number.search(ocr_result)
+            if match is None:
+                logging.debug(f"Value for {self.labels[roi]} is empty")
+                cleaned_result = '0'
+            else:
+                cleaned_result = match.group()
+            logging.debug(f'cleaned result {roi}: {cleaned_result}')
+            # Remove any leading '.' sometimes a - is read as a '.'
+            result = cleaned_result.lstrip('.')
+            conversion = self.conversions.get(roi)
+            if conversion is None:
+                result = float(result)
+            else:
+                result = conversion(result)
+            correction = self.corrections.get(roi)
+            if correction is not None:
+                result = correction(self, ball_data, roi, result, selected_club, offline_mode)
+            # Check values are not 0
+            if roi in self.must_not_be_zero and result == float(0):
+                raise ValueError(f"Value for '{self.labels[roi]}' is 0")
+            if roi == BallMetrics.VLA and (result <= 0 or result >= 90):
+                raise ValueError(f"Value for {self.labels[roi]} is <= 0 or >= 90")
+            if roi == BallMetrics.TOTAL_SPIN and result <= 100:
+                raise ValueError(f"Value for {self.labels[roi]} is <= 100")
+            # For some reason ball speed sometimes get an extra digit added
+            limit = ShotDataParser.upper_limits.get(roi)
+            if limit is not None and result > limit:
+                result = BallData.fix_out_of_bounds_metric(limit, result, roi)
+                ball_data.corrections[roi] = True
+            # Round to one decimal place
+            target = self.targets.get(roi)
+            if target is None:
+                setattr(ball_data, roi, math.floor(result*10)/10)
+            else:
+                metric, reverse = target
+                value = math.floor(result*10)/10
+                if reverse:
+                    value = -value
+                logging.debug(f'Setting {self.labels[metric]} for {self.launch_monitor} using the {self.labels[roi]} ROI value: {value}')
+                setattr(ball_data, metric, value)
+            logging.debug(f'Cleaned and corrected value: {result}')
+        except ValueError as e:
+            msg = f'{format(e)}'
+        except:
+            msg = f"Could not convert value {result} for '{self.labels[roi]}' to float 0"
+        finally:
+            if not msg is None:
+                logging.debug(msg)
+                ball_data.errors[roi] = msg
+                setattr(ball_data, roi, BallData.invalid_value)
@@ -0,0 +1,178 @@
+"""
+Write ahead journal of the shots sent to GSPro, so a shot isn't lost if the
+connector crashes or the connection to GSPro drops before GSPro acknowledges it.
+
+Each shot is journaled when it is produced, when it is sent and when GSPro
+acknowledges it, one JSON record per line. Shots without an acknowledgement can
+be resent after a restart with src.shot_journal_replay.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+
+class ShotJournalState:
+    PRODUCED = 'produced'
+    SENT = 'sent'
+    ACKED = 'acked'
+    # The connection was closed before it was sent
+    CANCELLED = 'cancelled'
+    FAILED = 'failed'
+
+
+class ShotJournal:
+    """
+    Append only shot journal. Records are queued and written by a background thread,
+    which writes everything waiting and then syncs the file to disk once, so no thread
+    recording a shot ever waits for the disk.
+    """
+
+    # Journals larger than this are rewritten with only the unacknowledged shots when opened
+    compact_size = 1024 * 1024
+    # Cancelled and failed shots are kept this many seconds to be resent with --include-cancelled
+    failed_max_age = 7 * 24 * 60 * 60
+
+    def __init__(self, path, sync_interval=0.2):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.__records = queue.Queue()
+        self.__file = None
+        self.__thread = None
+        self.__session = uuid.uuid4().hex[:8]
+        self.__count = 0
+        self.__lock = threading.Lock()
+
+    def open(self):
+        if self.__thread is not None:
+            return
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > ShotJournal.compact_size:
+                self.__compact()
+            self.__file = open(self.path, 'a', encoding='utf-8')
+        except OSError as e:
+            logging.warning(f'{self.__class__.__name__} could not open shot journal {self.path}: {format(e)}')
+            return
+        self.__thread = threading.Thread(target=self.__write, name='shot-journal', daemon=True)
+        self.__thread.start()
+
+    def close(self):
+        # Writes any records still queued before returning
+        if self.__thread is not None:
+            self.__records.put(None)
+            self.__thread.join()
+            self.__thread = None
+            self.__file.close()
+            self.__file = None
+
+    def new_id(self):
+        with self.__lock:
+            self.__count = self.__count + 1
+            return f'{self.__session}-{self.__count}'
+
+    def produced(self, ball_data):
+        """Journal a new shot, returns its journal id."""
+        shot_id = self.new_id()
+        self.record(shot_id, ShotJournalState.PRODUCED,
+                    raw={'shot': ball_data.to_gspro_json()},
+                    launch_monitor=ball_data.launch_monitor, club=ball_data.club)
+        return shot_id
+
+    def record(self, shot_id, state, raw=None, **kwargs):
+        """Queue a record to be journaled, raw maps field names to text that is already JSON."""
+        if self.__thread is None:
+            return
+        record = {'id': shot_id, 'state': state, 'time': time.time()}
+        record.update(kwargs)
+        self.__records.put((record, raw))
+
+    def __write(self):
+        last_sync = 0
+        finished = False
+        while not finished:
+            records = [self.__records.get()]
+            # Everything else already waiting goes in the same batch
+            while True:
+                try:
+                    records.append(self.__records.get_nowait())
+                except queue.Empty:
+                    break
+            if None in records:
+                finished = True
+                records = [record for record in records if record is not None]
+            try:
+                for record, raw in records:
+                    self.__file.write(ShotJournal.__line(record, raw))
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+            except (OSError, ValueError) as e:
+                logging.warning(f'{self.__class__.__name__} could not write to shot journal {self.path}: {format(e)}')
+            # Batch up the records arriving while waiting, rather than syncing for each one
+            wait = self.sync_interval - (time.monotonic() - last_sync)
+            last_sync = time.monotonic()
+            if not finished and wait > 0:
+                time.sleep(wait)
+
+    @staticmethod
+    def __line(record, raw=None):
+        line = json.dumps(record, separators=(',', ':'))
+        if raw:
+            line = line[:-1] + ''.join(f',"{field}":{text}' for field, text in raw.items()) + '}'
+        return line + '\n'
+
+    def __compact(self):
+        records = ShotJournal.read(self.path)
+        # The last record of each shot is its current state
+        states = dict((record['id'], record) for record in records)
+        oldest = time.time() - ShotJournal.failed_max_age
+        keep = set()
+        for shot_id, record in states.items():
+            if record['state'] == ShotJournalState.ACKED:
+                continue
+            if record['state'] in (ShotJournalState.CANCELLED, ShotJournalState.FAILED) and record['time'] < oldest:
+                continue
+            # Produced or sent shots were waiting for GSPro when the connector stopped and are always kept
+            keep.add(shot_id)
+        compacted = f'{self.path}.tmp'
+        with open(compacted, 'w', encoding='utf-8') as file:
+            for record in records:
+                if record['id'] in keep:
+                    file.write(ShotJournal.__line(record))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(compacted, self.path)
+        logging.debug(f'{self.__class__.__name__} compacted shot journal, {len(keep)} unacknowledged shots kept')
+
+    @staticmethod
+    def read(path):
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Partly written when the connector stopped
+                    logging.debug(f'Skipping incomplete shot journal record: {line}')
+        return records
+
+    @staticmethod
+    def unacknowledged(path, include_cancelled=False):
+        """The produced record of each shot GSPro hasn't acknowledged, in the order they were produced."""
+        shots = {}
+        for record in ShotJournal.read(path):
+            if record['state'] == ShotJournalState.PRODUCED:
+                shots[record['id']] = record
+            elif record['state'] == ShotJournalState.ACKED or \
+                    (record['state'] == ShotJournalState.CANCELLED and not include_cancelled):
+                shots.pop(record['id'], None)
+        return list(shots.values())
+
+    @staticmethod
+    def default_path(app_paths):
+        return os.path.join(app_paths.logs_path, 'shot_journal.jsonl')
+
@@ -0,0 +1,75 @@
+"""
+Resends the shots in the shot journal that GSPro never acknowledged, e.g. after
+the connector crashed or lost its connection to GSPro. Uses the connection
+settings of the connector, GSPro API Connect must be running.
+
+Usage:
+
+    python -m src.shot_journal_replay [--journal FILE] [--list] [--include-cancelled]
+"""
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from src.appdata import AppDataPaths
+from src.ball_data import BallData
+from src.gspro_connect import GSProConnect
+from src.settings import Settings
+from src.shot_journal import ShotJournal
+
+
+def replay(gspro_connect, shots):
+    sent = 0
+    for shot in shots:
+        ball_data = BallData()
+        ball_data.from_gspro(shot['shot'])
+        ball_data.launch_monitor = shot.get('launch_monitor')
+        print(f"Resending shot {shot['id']} from {datetime.fromtimestamp(shot['time']).isoformat(timespec='seconds')}")
+        try:
+            # Sent one at a time so a shot isn't sent before the one before it is acknowledged
+            gspro_connect.launch_ball(ball_data, journal_id=shot['id']).result()
+            sent = sent + 1
+        except Exception as e:
+            print(f'  failed: {format(e)}')
+            break
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resend the shots GSPro did not acknowledge')
+    parser.add_argument('--journal', help='shot journal, defaults to the connector\'s journal')
+    parser.add_argument('--list', action='store_true', help='only list the unacknowledged shots')
+    parser.add_argument('--include-cancelled', action='store_true', help='also resend shots cancelled by the connection being closed')
+    parser.add_argument('--debug', action='store_true', help='show debug logging')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    app_paths = AppDataPaths('mlm2pro-gspro-connect')
+    app_paths.setup()
+    path = args.journal or ShotJournal.default_path(app_paths)
+    shots = ShotJournal.unacknowledged(path, include_cancelled=args.include_cancelled)
+    print(f'{len(shots)} unacknowledged shots in {path}')
+    if args.list:
+        for shot in shots:
+            print(json.dumps(shot))
+        return
+    if len(shots) <= 0:
+        return
+    settings = Settings(app_paths)
+    journal = ShotJournal(path)
+    journal.open()
+    gspro_connect = GSProConnect(settings.device_id, settings.units, settings.api_version, journal=journal)
+    try:
+        gspro_connect.init_socket(settings.ip_address, settings.port)
+        sent = replay(gspro_connect, shots)
+        print(f'Resent {sent} of {len(shots)} shots')
+    except OSError as e:
+        print(f'Could not connect to GSPro at {settings.ip_address}:{settings.port}: {format(e)}')
+        sys.exit(1)
+    finally:
+        gspro_connect.terminate_session()
+        journal.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import numpy as np
+
+
+class ShotTiming:
+    """
+    High resolution timestamps for a shot on its way through the connector, from
+    the screenshot it was read from to the response from GSPro.
+
+    Each mark records the time since the previous mark as the duration of that stage,
+    OCR time for each ROI is recorded separately as the ROI's can be OCR'd in parallel.
+    """
+
+    def __init__(self):
+        self.time = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.last_ns = self.start_ns
+        self.stages = {}
+        self.rois = {}
+
+    def mark(self, stage):
+        now = time.perf_counter_ns()
+        self.stages[stage] = now - self.last_ns
+        self.last_ns = now
+
+    def add_roi(self, roi, duration_ns):
+        self.rois[roi] = duration_ns
+
+    def total(self):
+        return self.last_ns - self.start_ns
+
+    def to_record(self, **kwargs):
+        record = {
+            'time': datetime.fromtimestamp(self.time).isoformat(timespec='milliseconds'),
+            'total_ms': round(self.total() / 1e6, 3),
+            'stages_ms': {stage: round(duration / 1e6, 3) for stage, duration in self.stages.items()},
+            'rois_ms': {roi: round(duration / 1e6, 3) for roi, duration in self.rois.items()}
+        }
+        record.update(kwargs)
+        return record
+
+
+class ShotTimingLog:
+    """
+    Appends a JSON record per shot sent to GSPro to a log file and keeps the most
+    recent timings for rolling percentiles. add() is called on the GUI thread so the
+    records are written by a background thread, started by the first one added.
+    """
+
+    def __init__(self, path, size=100):
+        self.path = path
+        self.totals = deque(maxlen=size)
+        self.stages = {}
+        self.size = size
+        self.__records = queue.Queue()
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def add(self, timing: ShotTiming, **kwargs):
+        with self.__lock:
+            self.totals.append(timing.total())
+            for stage, duration in timing.stages.items():
+                if stage not in self.stages:
+                    self.stages[stage] = deque(maxlen=self.size)
+                self.stages[stage].append(duration)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__write, name='shot-timing-log', daemon=True)
+                self.__thread.start()
+        self.__records.put(timing.to_record(**kwargs))
+
+    def close(self):
+        # Writes any records still queued before returning
+        with self.__lock:
+            thread = self.__thread
+            self.__thread = None
+        if thread is not None:
+            self.__records.put(None)
+            thread.join()
+
+    def __write(self):
+        finished = False
+        while not finished:
+            records = [self.__records.get()]
+            # Everything else already waiting is written with the same open
+            while True:
+                try:
+                    records.append(self.__records.get_nowait())
+                except queue.Empty:
+                    break
+            if None in records:
+                finished = True
+                records = [record for record in records if record is not None]
+            if len(records) <= 0:
+                continue
+            try:
+                with open(self.path, 'a') as file:
+                    file.write(''.join(json.dumps(record) + '\n' for record in records))
+            except OSError as e:
+                logging.debug(f'{self.__class__.__name__} could not write shot timing to {self.path}: {format(e)}')
+
+    @staticmethod
+    def __percentiles(values):
+        if len(values) <= 0:
+            return None
+        p50, p95 = np.percentile(np.array(values) / 1e6, [50, 95])
+        return float(p50), float(p95)
+
+    def percentiles(self):
+        """(p50, p95) in ms of the total time for the recent shots, None if there are none."""
+        with self.__lock:
+            return ShotTimingLog.__percentiles(self.totals)
+
+    def stage_percentiles(self):
+        with self.__lock:
+            return {stage: ShotTimingLog.__percentiles(self.stages[stage]) for stage in self.stages}
+
+    @staticmethod
+    def default_path(app_paths):
+        return os.path.join(app_paths.logs_path, 'shot_timing.jsonl')
@@ -0,0 +1,132 @@
+"""
+Learns the glyph templates TemplateRecognizer reads ROI's with from labelled OCR
+benchmark datasets, see src.ocr_benchmark for the dataset format.
+
+Usage (from the folder containing the .traineddata files):
+
+    python -m src.template_learner DATASET [DATASET ...] [--output FILE]
+
+Every labelled frame is OCR'd by tesseract. The ROI's whose text is parsed to the
+labelled value, and split into as many glyphs as tesseract read characters, give
+one sample glyph per character. A character's template is the mean of its samples.
+The templates are saved as <train_file>.npz, where the connector looks for them.
+"""
+import argparse
+import dataclasses
+import logging
+import os
+import tempfile
+import numpy as np
+from src.ball_data import BallData
+from src.custom_exception import CaptureSourceFinished
+from src.frame_reader import text_polarity
+from src.ocr_benchmark import frame_label, load_capture_source, load_dataset, load_device, load_settings, same_value
+from src.screenshot import Screenshot
+from src.shot_data_parser import ShotDataParser
+from src.template_recognizer import TemplateRecognizer
+
+
+class TemplateSamples:
+
+    def __init__(self):
+        self.train_file = None
+        self.glyphs = {}
+        self.rois = 0
+        self.rejected = 0
+
+    def add(self, text, image, dark_text=None):
+        """Add the glyphs of a ROI image read as text, returns False if they can't be paired up."""
+        glyphs = TemplateRecognizer.glyphs(image, dark_text)
+        if glyphs is None or len(glyphs) != len(text):
+            return False
+        for char, glyph in zip(text, glyphs):
+            self.glyphs.setdefault(char, []).append(glyph)
+        return True
+
+    def templates(self):
+        chars = sorted(self.glyphs)
+        return chars, np.stack([np.mean(self.glyphs[char], axis=0) for char in chars])
+
+    def accuracy(self, chars, templates):
+        """Fraction of the sample glyphs matched to the character they were read as."""
+        templates = TemplateRecognizer.normalise(templates.reshape(len(chars), -1))
+        correct = 0
+        total = 0
+        for char in self.glyphs:
+            glyphs = np.stack(self.glyphs[char])
+            best = (TemplateRecognizer.normalise(glyphs.reshape(len(glyphs), -1)) @ templates.T).argmax(axis=1)
+            correct = correct + sum(1 for i in best if chars[i] == char)
+            total = total + len(best)
+        return correct / total if total > 0 else None
+
+
+def learn_dataset(path, samples: TemplateSamples):
+    dataset, labels = load_dataset(path)
+    capture_source = load_capture_source(path, dataset)
+    device = load_device(path, dataset['device'])
+    with tempfile.TemporaryDirectory() as home_folder:
+        settings = load_settings(dataset, home_folder)
+        screenshot = Screenshot(settings, capture_source=capture_source)
+        screenshot.selected_club = dataset.get('club', 'DR')
+        # Always read with tesseract, the templates are what is being learnt
+        profile = dataclasses.replace(screenshot.launch_monitor_profile(), glyph_templates=False)
+        if samples.train_file is not None and samples.train_file != profile.train_file:
+            raise ValueError(f"Dataset {path} is read with {profile.train_file}.traineddata not {samples.train_file}.traineddata")
+        samples.train_file = profile.train_file
+        options = screenshot.frame_reader_options()
+        shot_data_parser = None if profile.putting else ShotDataParser(profile)
+        try:
+            while True:
+                try:
+                    screenshot.capture_screenshot(device)
+                except CaptureSourceFinished:
+                    break
+                frame = frame_label(capture_source)
+                if frame not in labels:
+                    continue
+                images = screenshot.frame_reader.preprocess(
+                    screenshot.screenshot_image, screenshot.screenshot_offset, screenshot.rois, profile, options)
+                ocr_results = screenshot.frame_reader.recognise(images, profile, options)
+                balldata = BallData()
+                for roi in labels[frame]:
+                    if roi not in images:
+                        continue
+                    ocr_result, conf = ocr_results[roi]
+                    if profile.putting:
+                        balldata.process_putt_data(ocr_result, roi, None)
+                    else:
+                        shot_data_parser.parse(balldata, ocr_result, roi, screenshot.selected_club, options.offline_mode)
+                    samples.rois = samples.rois + 1
+                    text = ''.join(ocr_result.split())
+                    if not same_value(getattr(balldata, roi, None), labels[frame][roi]) or not samples.add(text, images[roi], text_polarity(profile)):
+                        logging.debug(f'{frame} {roi}: {text} not used, labelled {labels[frame][roi]}')
+                        samples.rejected = samples.rejected + 1
+        finally:
+            screenshot.end_ocr()
+            capture_source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Learn glyph templates for the template recognizer from labelled OCR benchmark datasets')
+    parser.add_argument('datasets', nargs='+', help='dataset folders containing a benchmark.json file')
+    parser.add_argument('--output', help='templates file, <train_file>.npz in the current folder by default')
+    parser.add_argument('--debug', action='store_true', help='show debug logging')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    samples = TemplateSamples()
+    for dataset in args.datasets:
+        learn_dataset(dataset, samples)
+    if len(samples.glyphs) <= 0:
+        print(f'No glyphs learnt, {samples.rejected} of {samples.rois} labelled ROI\'s were not read as labelled')
+        return
+    chars, templates = samples.templates()
+    output = args.output if args.output else os.path.join(os.getcwd(), f'{samples.train_file}.npz')
+    TemplateRecognizer.save(output, chars, templates)
+    print(f'{output}: {len(chars)} templates from {samples.rois - samples.rejected} of {samples.rois} labelled ROI\'s')
+    for char in chars:
+        print(f'  {char!r:<6}{len(samples.glyphs[char]):>6} samples')
+    print(f'  sample glyphs matched to their character: {samples.accuracy(chars, templates) * 100:.1f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import logging
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+
+class TemplateRecognizer:
+    """
+    Reads the text in a preprocessed ROI image by matching its glyphs against glyph
+    templates, much faster than tesseract for the short numbers in one font that the
+    launch monitor apps show.
+
+    Glyphs are found as connected components, components that overlap horizontally
+    are one glyph. Each glyph is cut from the full height of the line of text, so a
+    '.' and a '-' differ by where they are in the line, and scaled to the template
+    size. All glyphs of an ROI are then correlated with all templates in one matrix
+    product. The confidence is the lowest correlation of any glyph as a percentage,
+    reads below min_confidence return None so the ROI can be OCR'd by tesseract.
+
+    Templates are learnt from labelled benchmark datasets by src.template_learner and
+    saved next to the traineddata file as <train_file>.npz.
+    """
+
+    # Width and height glyphs are scaled to
+    size = (12, 20)
+    # Components smaller than this are noise
+    min_area = 2
+    min_confidence = 85
+
+    def __init__(self, path='.\\'):
+        self.path = path
+        self.train_file = None
+        self.templates_mtime = None
+        self.chars = None
+        self.templates = None
+        self.reads = 0
+        self.fallbacks = 0
+        self.__lock = threading.Lock()
+
+    def templates_file(self, train_file):
+        return os.path.join(self.path, f'{train_file}.npz')
+
+    def __templates_mtime(self, train_file):
+        try:
+            return os.stat(self.templates_file(train_file)).st_mtime
+        except OSError:
+            return None
+
+    def use(self, train_file):
+        """Load the templates for train_file if they aren't loaded, returns False if there are none."""
+        with self.__lock:
+            mtime = self.__templates_mtime(train_file)
+            if train_file != self.train_file or mtime != self.templates_mtime:
+                self.train_file = train_file
+                self.templates_mtime = mtime
+                self.chars = None
+                self.templates = None
+                if mtime is None:
+                    logging.debug(f'{self.__class__.__name__} no {train_file}.npz glyph templates, using tesseract')
+                else:
+                    try:
+                        chars, templates = TemplateRecognizer.load(self.templates_file(train_file))
+                        self.chars = chars
+                        self.templates = TemplateRecognizer.normalise(templates.reshape(len(chars), -1))
+                        logging.debug(f'{self.__class__.__name__} loaded {len(chars)} glyph templates from {train_file}.npz')
+                    except:
+                        logging.debug(f'{self.__class__.__name__} could not load {train_file}.npz glyph templates, using tesseract')
+            return self.templates is not None
+
+    @staticmethod
+    def load(file):
+        with np.load(file, allow_pickle=False) as templates:
+            return [str(char) for char in templates['chars']], templates['templates'].astype(np.float32)
+
+    @staticmethod
+    def save(file, chars, templates):
+        np.savez_compressed(file, chars=np.array(chars), templates=np.asarray(templates, dtype=np.float32))
+
+    @staticmethod
+    def normalise(vectors):
+        # Zero mean unit length so a dot product is the correlation, blank glyphs stay zero
+        vectors = vectors - vectors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    @staticmethod
+    def glyphs(image, dark_text=None):
+        """
+        Segment a grey scale ROI image into glyphs, returns them left to right scaled to
+        size as a (glyphs, height, width) float32 array in the range 0 to 1, or None if
+        the text runs into the padding past the edge of the ROI and can't be segmented.
+
+        dark_text is True for dark text on a light background, e.g. the images threshold_crop
+        returns, False for light text. If None the text is taken to be the fewer pixels.
+        """
+        if dark_text is None:
+            _, mask = cv2.threshold(image, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            if mask.mean() > 0.5:
+                mask = 1 - mask
+        else:
+            _, mask = cv2.threshold(image, 0, 1, (cv2.THRESH_BINARY_INV if dark_text else cv2.THRESH_BINARY) + cv2.THRESH_OTSU)
+        # threshold_crop pads past the right and bottom edges of the ROI with black, the
+        # columns and rows at those edges that are all text are that padding, not text
+        roi_columns = np.flatnonzero(mask.min(axis=0) == 0)
+        roi_rows = np.flatnonzero(mask.min(axis=1) == 0)
+        width, height = TemplateRecognizer.size
+        if len(roi_columns) <= 0 or len(roi_rows) <= 0:
+            return np.zeros((0, height, width), dtype=np.float32)
+        roi_right = roi_columns[-1] + 1
+        roi_bottom = roi_rows[-1] + 1
+        padded_right = roi_right < mask.shape[1]
+        padded_bottom = roi_bottom < mask.shape[0]
+        mask = mask[:roi_bottom, :roi_right]
+        # Text touching the padding is cut off by the edge of the ROI, and would be merged
+        # with the padding, so it is left to tesseract rather than losing a glyph
+        if (padded_right and mask[:, -1].any()) or (padded_bottom and mask[-1].any()):
+            return None
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8, ltype=cv2.CV_16U)
+        # 1 for the components that are text, 0 for the background and noise
+        keep = stats[:, cv2.CC_STAT_AREA] >= TemplateRecognizer.min_area
+        keep[0] = False
+        text = keep.astype(np.float32)
+        # Left, top, width, height, area of each component, python ints are much faster to work with one at a time
+        stats = stats.tolist()
+        keep = keep.tolist()
+        components = sorted((stats[i] for i in range(1, count) if keep[i]), key=lambda stat: stat[0])
+        if len(components) <= 0:
+            return np.zeros((0, height, width), dtype=np.float32)
+        # Merge components that overlap horizontally, e.g. the parts of a '%'
+        columns = []
+        for left, _, w, _, _ in components:
+            if len(columns) > 0 and left < columns[-1][1]:
+                columns[-1][1] = max(columns[-1][1], left + w)
+            else:
+                columns.append([left, left + w])
+        top = min(stat[1] for stat in components)
+        bottom = max(stat[1] + stat[3] for stat in components)
+        if len(components) == count - 1:
+            line = mask[top:bottom].astype(np.float32)
+        else:
+            # Without the noise, the columns don't overlap so each only contains its own glyph
+            line = text[labels[top:bottom]]
+        glyphs = np.empty((len(columns), height, width), dtype=np.float32)
+        for n, (left, right) in enumerate(columns):
+            glyphs[n] = cv2.resize(line[:, left:right], (width, height), interpolation=cv2.INTER_AREA)
+        return glyphs
+
+    def recognise(self, image, roi, timing=None, dark_text=None):
+        """
+        Read a grey scale ROI image with the loaded templates, returns the text and confidence
+        or None if the text couldn't be read confidently. The time taken is added to timing if
+        specified, dark_text is the text polarity, see glyphs.
+        """
+        start = time.perf_counter_ns()
+        glyphs = TemplateRecognizer.glyphs(image, dark_text)
+        result = None
+        if glyphs is None:
+            logging.debug(f'ocr {roi} - text runs into the edge of the ROI, using tesseract')
+        elif len(glyphs) > 0:
+            scores = TemplateRecognizer.normalise(glyphs.reshape(len(glyphs), -1)) @ self.templates.T
+            best = scores.argmax(axis=1)
+            conf = int(scores[np.arange(len(best)), best].min() * 100)
+            text = ''.join(self.chars[i] for i in best)
+            if conf >= TemplateRecognizer.min_confidence:
+                result = (text, conf)
+                logging.debug(f'ocr {roi} - template confidence: {conf} result: {text}')
+            else:
+                logging.debug(f'ocr {roi} - template confidence: {conf} result: {text} too low, using tesseract')
+        if result is None:
+            self.fallbacks = self.fallbacks + 1
+        else:
+            self.reads = self.reads + 1
+        if timing is not None:
+            timing.add_roi(roi, time.perf_counter_ns() - start)
+        return result
+
+    def stats(self):
+        reads = self.reads + self.fallbacks
+        return {
+            'templates': len(self.chars) if self.chars is not None else 0,
+            'reads': self.reads,
+            'fallbacks': self.fallbacks,
+            'read_rate': self.reads / reads if reads > 0 else None
+        }
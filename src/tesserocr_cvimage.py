@@ -4,6 +4,15 @@ from tesserocr import PyTessBaseAPI
 
 class TesserocrCVImage(PyTessBaseAPI):
 
+    whitelist = ''
+
+    def SetWhitelist(self, whitelist):
+        """ Limits the characters recognised to whitelist, any character if whitelist is empty or None. """
+        whitelist = whitelist or ''
+        if whitelist != self.whitelist:
+            self.SetVariable('tessedit_char_whitelist', whitelist)
+            self.whitelist = whitelist
+
     def SetCVImage(self, image, color='RGB'):
         """ Sets an OpenCV-style image for recognition.
 
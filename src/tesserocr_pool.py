@@ -0,0 +1,193 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import tesserocr
+from src.launch_monitor_profile import OcrConstraints
+from src.ocr_cache import OcrCache
+from src.tesserocr_cvimage import TesserocrCVImage
+
+
+class TesserocrPool:
+    """
+    Long lived tesseract engines keyed by traineddata name and page segmentation mode.
+
+    Creating a PyTessBaseAPI loads the whole traineddata file so engines are created
+    once and reused for every frame. The pool is rebuilt when a different traineddata
+    file or user patterns are requested or the traineddata file on disk changes. User
+    patterns can only be set when an engine is created, so all ROI's share the patterns
+    of every metric of the launch monitor rather than each pattern set needing engines
+    of its own, the whitelist set for each ROI still limits what it can be read as.
+    """
+
+    def __init__(self, path='.\\'):
+        self.path = path
+        self.train_file = None
+        self.train_file_mtime = None
+        self.patterns = ()
+        self.__apis = {}
+        self.__lock = threading.RLock()
+
+    def __train_file_mtime(self, train_file):
+        try:
+            return os.stat(os.path.join(self.path, f'{train_file}.traineddata')).st_mtime
+        except OSError:
+            return None
+
+    def use(self, train_file, patterns=()):
+        with self.__lock:
+            mtime = self.__train_file_mtime(train_file)
+            if train_file != self.train_file or mtime != self.train_file_mtime or patterns != self.patterns:
+                if self.train_file is not None:
+                    logging.debug(f'{self.__class__.__name__} {self.train_file}.traineddata replaced by {train_file}.traineddata, rebuilding engines')
+                self.end()
+                self.train_file = train_file
+                self.train_file_mtime = mtime
+                self.patterns = patterns
+
+    def api(self, psm) -> TesserocrCVImage:
+        with self.__lock:
+            key = (self.train_file, psm)
+            api = self.__apis.get(key)
+            if api is None:
+                logging.debug(f'{self.__class__.__name__} creating engine for {self.train_file}.traineddata psm: {psm} patterns: {self.patterns}')
+                variables = {}
+                if len(self.patterns) > 0:
+                    variables['user_patterns_file'] = TesserocrPool.__patterns_file(self.patterns)
+                api = TesserocrCVImage(psm=psm, lang=self.train_file, path=self.path, variables=variables)
+                self.__apis[key] = api
+            return api
+
+    @staticmethod
+    def __patterns_file(patterns):
+        text = '\n'.join(patterns) + '\n'
+        digest = hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+        file = os.path.join(tempfile.gettempdir(), f'tesserocr-{digest}.patterns')
+        if not os.path.exists(file):
+            # Written to a file of its own and renamed so another process creating the same
+            # file at the same time can't be handed a partly written one
+            handle, temp_file = tempfile.mkstemp(suffix='.patterns', dir=tempfile.gettempdir())
+            try:
+                with os.fdopen(handle, 'w') as patterns_file:
+                    patterns_file.write(text)
+                os.replace(temp_file, file)
+            except OSError:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+                if not os.path.exists(file):
+                    raise
+        return file
+
+    def end(self):
+        with self.__lock:
+            for api in self.__apis.values():
+                api.End()
+            self.__apis = {}
+
+
+def recognise(pool, image, roi, timing=None, cache=None, constraints: OcrConstraints = None):
+    """
+    OCR a single grey scale ROI image, retrying with RAW_LINE if SINGLE_WORD returns nothing usable.
+    Returns the text and mean confidence, the time taken is added to timing if specified.
+    Images already read by the same engine are looked up in cache if specified.
+    What can be read is limited by constraints if specified.
+    """
+    start = time.perf_counter_ns()
+    key = None
+    if cache is not None:
+        key = OcrCache.key(image, pool.train_file, pool.train_file_mtime, tesserocr.PSM.SINGLE_WORD, constraints, pool.patterns)
+        cached = cache.get(key)
+        if cached is not None:
+            ocr_result, conf = cached
+            logging.debug(f'ocr {roi} - cached confidence: {conf} result: {ocr_result.strip()}')
+            if timing is not None:
+                timing.add_roi(roi, time.perf_counter_ns() - start)
+            return ocr_result, conf
+    ocr_result, conf = _read(pool, tesserocr.PSM.SINGLE_WORD, image, constraints)
+    logging.debug(f'ocr {roi} - confidence: {conf} result: {ocr_result.strip()}')
+    if conf <= 0:
+        logging.debug(f'ocr {roi} confidence <= 0 retrying with RAW_LINE')
+    elif constraints is not None and constraints.max_length is not None and len(ocr_result.strip()) > constraints.max_length:
+        logging.debug(f'ocr {roi} longer than {constraints.max_length} characters retrying with RAW_LINE')
+        conf = 0
+    if conf <= 0:
+        ocr_result, conf = _read(pool, tesserocr.PSM.RAW_LINE, image, constraints)
+        logging.debug(f'fallback ocr {roi} - confidence: {conf} result: {ocr_result}')
+    if cache is not None:
+        cache.put(key, ocr_result, conf)
+    if timing is not None:
+        timing.add_roi(roi, time.perf_counter_ns() - start)
+    return ocr_result, conf
+
+
+def _read(pool, psm, image, constraints: OcrConstraints):
+    if constraints is None:
+        constraints = OcrConstraints()
+    tesserocr_api = pool.api(psm)
+    tesserocr_api.SetWhitelist(constraints.whitelist)
+    tesserocr_api.SetCVImage(image)
+    if constraints.dpi is not None:
+        tesserocr_api.SetSourceResolution(constraints.dpi)
+    return tesserocr_api.GetUTF8Text(), tesserocr_api.MeanTextConf()
+
+
+class TesserocrThreadPool:
+    """
+    Runs OCR for all ROI's of a frame at the same time, tesserocr releases the GIL
+    while recognising so the ROI's are processed in parallel. Each pool thread owns
+    its own TesserocrPool as a tesseract engine can't be shared between threads.
+    """
+
+    def __init__(self, max_workers=None, path='.\\'):
+        self.path = path
+        self.max_workers = max_workers if max_workers is not None else min(os.cpu_count() or 1, 10)
+        self.train_file = None
+        self.patterns = ()
+        self.__executor = None
+        self.__local = threading.local()
+        self.__pools = []
+        self.__lock = threading.Lock()
+
+    def use(self, train_file, patterns=()):
+        if train_file != self.train_file:
+            self.end()
+            self.train_file = train_file
+        self.patterns = patterns
+
+    def __thread_pool(self):
+        pool = getattr(self.__local, 'pool', None)
+        if pool is None:
+            pool = TesserocrPool(self.path)
+            self.__local.pool = pool
+            with self.__lock:
+                self.__pools.append(pool)
+        pool.use(self.train_file, self.patterns)
+        return pool
+
+    def __recognise(self, image, roi, timing, cache, constraints):
+        return recognise(self.__thread_pool(), image, roi, timing, cache, constraints)
+
+    def recognise(self, images, timing=None, cache=None, constraints=None):
+        """
+        OCR a dict of ROI images, the results are returned in the same order as images.
+        constraints is a dict of the OcrConstraints for each ROI.
+        """
+        if constraints is None:
+            constraints = {}
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ocr')
+        futures = {roi: self.__executor.submit(self.__recognise, images[roi], roi, timing, cache, constraints.get(roi)) for roi in images}
+        return {roi: futures[roi].result() for roi in futures}
+
+    def end(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+        with self.__lock:
+            for pool in self.__pools:
+                pool.end()
+            self.__pools = []
+        self.__local = threading.local()
@@ -6,6 +6,7 @@ from threading import Event
 from PySide6.QtCore import Signal
 
 from src.gspro_connect import GSProConnect
+from src.json_stream import JSONStreamDecoder
 from src.settings import Settings
 from src.worker_base import WorkerBase
 
@@ -25,6 +26,7 @@ class WorkerDeviceLaunchMonitorRelayServer(WorkerBase):
         self.gspro_connection = gspro_connection
         self.name = 'WorkerDeviceLaunchMonitorRelayServer'
         self.connection = None
+        self.decoder = JSONStreamDecoder()
         self._shutdown = Event()
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._socket.settimeout(1)
@@ -47,6 +49,7 @@ class WorkerDeviceLaunchMonitorRelayServer(WorkerBase):
                     pass
                 else:
                     msg = f"Connected to connector from: {addr[0]}:{addr[1]}"
+                    self.decoder.reset()
                     self.connected.emit()
                     logging.debug(f'{self.name}: {msg}')
                     while not self._shutdown.is_set():
@@ -55,17 +58,19 @@ class WorkerDeviceLaunchMonitorRelayServer(WorkerBase):
                             # Wait for data
                             data = self.connection.recv(1024)
                             if data is not None and len(data) > 0:
-                                logging.debug(f'{self.name}: connector received data: {data.decode()}')
-                                if self.gspro_connection.connected():
-                                    try:
-                                        msg = self.gspro_connection.send_msg(data)
-                                        self.send_msg(msg)
-                                        self.relay_server_shot.emit(data)
-                                        logging.debug(f'{self.name}: connector sent data to GSPro result: {msg.decode()}')
-                                    except Exception as e:
-                                        logging.debug(
-                                            f'Error when trying to send shot to GSPro, process {self.name}: {format(e)}, {traceback.format_exc()}')
-                                        self.shot_error.emit((e, traceback.format_exc()))
+                                # Forward each complete message, a read can hold part of one or several
+                                for frame in self.decoder.frames(data):
+                                    logging.debug(f'{self.name}: connector received data: {frame.decode()}')
+                                    if self.gspro_connection.connected():
+                                        try:
+                                            msg = self.gspro_connection.send_msg(frame)
+                                            self.send_msg(msg)
+                                            self.relay_server_shot.emit(frame)
+                                            logging.debug(f'{self.name}: connector sent data to GSPro result: {msg.decode()}')
+                                        except Exception as e:
+                                            logging.debug(
+                                                f'Error when trying to send shot to GSPro, process {self.name}: {format(e)}, {traceback.format_exc()}')
+                                            self.shot_error.emit((e, traceback.format_exc()))
                             else:
                                 self.disconnected.emit()
                                 break
@@ -1,12 +1,16 @@
+import logging
 import traceback
 from PySide6.QtCore import Signal
 
+from src.custom_exception import GSProSendQueueFull
 from src.gspro_connect import GSProConnect
 from src.worker_base import WorkerBase
 
 
 class WorkerGspro(WorkerBase):
     sent = Signal(object or None)
+    # The shot and the reason it wasn't sent, the connection is still usable
+    dropped = Signal(object, str)
 
     def __init__(self, gspro_connection: GSProConnect):
         super().__init__()
@@ -15,13 +19,35 @@ class WorkerGspro(WorkerBase):
     def run(self, balldata=None):
         if balldata is not None:
             try:
+                if balldata.timing is not None:
+                    # Time taken for the shot to be passed from the launch monitor thread
+                    balldata.timing.mark('signal')
                 self.started.emit()
-                self.gspro_connection.launch_ball(balldata)
+                # Only queues the shot, the result is reported when GSPro responds
+                response = self.gspro_connection.launch_ball(balldata)
             except Exception as e:
                 traceback.print_exc()
                 self.error.emit((e, traceback.format_exc()))
+                self.finished.emit()  # Done
+            else:
+                if response is None:
+                    self.sent.emit(balldata)
+                    self.finished.emit()
+                else:
+                    response.add_done_callback(lambda future: self.__response(balldata, future))
+
+    def __response(self, balldata, future):
+        # Runs on the GSPro reader thread, or whichever thread cancelled the shot
+        try:
+            if future.cancelled():
+                logging.info('Shot not sent to GSPro, the connection was closed')
+            elif isinstance(future.exception(), GSProSendQueueFull):
+                logging.warning(f'Shot not sent to GSPro: {format(future.exception())}')
+                self.dropped.emit(balldata, format(future.exception()))
+            elif future.exception() is not None:
+                e = future.exception()
+                self.error.emit((e, ''.join(traceback.format_exception(e))))
             else:
                 self.sent.emit(balldata)  # Return the result of the processing
-            finally:
-                self.finished.emit()  # Done
-                
\ No newline at end of file
+        finally:
+            self.finished.emit()  # Done
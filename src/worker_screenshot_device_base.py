@@ -1,6 +1,10 @@
 import logging
+import traceback
+from collections import deque
+from concurrent.futures import CancelledError, wait
 from datetime import datetime
 from PySide6.QtCore import Signal
+from src.capture_scheduler import CaptureScheduler
 from src.settings import Settings
 from src.worker_base import WorkerBase
 
@@ -18,41 +22,120 @@ class WorkerScreenshotBase(WorkerBase):
         self.settings = settings
         self.time_of_last_shot = datetime.now()
         self.name = 'WorkerScreenshotDeviceBase'
+        # Frames are read in OCR processes when set, see OcrProcessPool
+        self.ocr_pool = None
+        self.ocr_pending = deque()
+        self.scheduler = CaptureScheduler(settings.screenshot_interval)
+
+    def club_selected(self, club):
+        super().club_selected(club)
+        # A shot is likely soon
+        self.scheduler.activity()
+
+    def shutdown(self):
+        super().shutdown()
+        self.scheduler.wake()
+
+    def wait_for_screenshot(self):
+        """Wait until the next screenshot is due, returns False if the worker was shut down."""
+        self.scheduler.wait(self._shutdown)
+        return self.__next_screenshot()
+
+    def __next_screenshot(self):
+        if self._shutdown.is_set():
+            return False
+        self.scheduler.tick()
+        # When _pause is clear we wait(suspended) if set we process
+        if self.is_paused():
+            self._pause.wait()
+            # Time spent paused isn't a missed deadline
+            self.scheduler.restart()
+        return not self._shutdown.is_set()
 
     def do_screenshot(self, screenshot, settings, rois_setup):
         # Grab sreenshot and process data, checks if this is a new shot
         screenshot.capture_screenshot(settings, rois_setup)
+        if screenshot.screenshot_changed:
+            self.scheduler.activity()
         if screenshot.screenshot_new:
-            screenshot.ocr_image()
-            if screenshot.new_shot:
-                if screenshot.balldata.good_shot:
-                    # If we receive more than 1 shot in 5 seconds assume it's a ghost shot
-                    # so ignore, if we receive more than 2 shots display warning to user to set
-                    # camera to stationary
-                    last_shot_seconds = (datetime.now() - self.time_of_last_shot).seconds
-                    if last_shot_seconds <= 5:
-                        self.shot_count = self.shot_count + 1
-                    else:
+            future = None
+            if self.ocr_pool is not None:
+                future = screenshot.submit_ocr(self.ocr_pool)
+            if future is not None:
+                self.ocr_pending.append(future)
+            else:
+                # Every OCR process is busy, shots are handled in the order they were captured
+                self.finish_ocr(screenshot, None)
+                screenshot.ocr_image()
+                self.shot_read(screenshot)
+        else:
+            self.same_shot.emit()
+
+    def wait_for_ocr(self, screenshot):
+        """
+        Wait until the next screenshot is due, handling frames read by the OCR processes
+        as they arrive. Returns False if the worker was shut down.
+        """
+        while len(self.ocr_pending) > 0 and not self._shutdown.is_set():
+            remaining = self.scheduler.time_to_next()
+            if remaining <= 0 or len(wait([self.ocr_pending[0]], timeout=remaining).done) <= 0:
+                break
+            self.finish_ocr(screenshot, 0)
+        return self.wait_for_screenshot()
+
+    def finish_ocr(self, screenshot, timeout):
+        """
+        Handle the frames read so far in the order they were captured, waiting up to
+        timeout for each one, None waits until they have all been read.
+        """
+        while len(self.ocr_pending) > 0:
+            if len(wait([self.ocr_pending[0]], timeout=timeout).done) <= 0:
+                return
+            future = self.ocr_pending.popleft()
+            try:
+                balldata = future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                logging.debug(f'Error in process {self.name} OCR process: {format(e)}, {traceback.format_exc()}')
+                self.error.emit((e, traceback.format_exc()))
+                continue
+            screenshot.process_balldata(balldata)
+            self.shot_read(screenshot)
+
+    def cancel_ocr(self):
+        for future in self.ocr_pending:
+            future.cancel()
+        self.ocr_pending.clear()
+
+    def shot_read(self, screenshot):
+        if screenshot.new_shot:
+            if screenshot.balldata.good_shot:
+                # If we receive more than 1 shot in 5 seconds assume it's a ghost shot
+                # so ignore, if we receive more than 2 shots display warning to user to set
+                # camera to stationary
+                last_shot_seconds = (datetime.now() - self.time_of_last_shot).seconds
+                if last_shot_seconds <= 5:
+                    self.shot_count = self.shot_count + 1
+                else:
+                    self.shot_count = 0
+                self.time_of_last_shot = datetime.now()
+                if self.shot_count >= 1:
+                    self.same_shot.emit()
+                    logging.info(f"Process {self.name} shot received within 5 seconds of last shot, assuming ghost shot ignoring")
+                    # Ghost ignore
+                    if self.shot_count > 2:
+                        # More than 3 ghosts display camera settings warning
+                        logging.info(f"Process {self.name} more than 2 shots received within 5 seconds of last shot, warn user to change camera setting")
+                        self.too_many_ghost_shots.emit()
                         self.shot_count = 0
-                    self.time_of_last_shot = datetime.now()
-                    if self.shot_count >= 1:
-                        self.same_shot.emit()
-                        logging.info(f"Process {self.name} shot received within 5 seconds of last shot, assuming ghost shot ignoring")
-                        # Ghost ignore
-                        if self.shot_count > 2:
-                            # More than 3 ghosts display camera settings warning
-                            logging.info(f"Process {self.name} more than 2 shots received within 5 seconds of last shot, warn user to change camera setting")
-                            self.too_many_ghost_shots.emit()
-                            self.shot_count = 0
-                    else:
-                        logging.info(f"Process {self.name} good shot send to GSPro")
-                        self.shot.emit(screenshot.balldata)
                 else:
-                    logging.info(
-                        f"Process {self.name} bad shot data: {screenshot.balldata.to_json()}, errors: {screenshot.balldata.errors}")
-                    self.bad_shot.emit(screenshot.balldata)
+                    logging.info(f"Process {self.name} good shot send to GSPro")
+                    self.shot.emit(screenshot.balldata)
             else:
-                logging.info(f"Process {self.name} same shot do not send to GSPro")
-                self.same_shot.emit()
+                logging.info(
+                    f"Process {self.name} bad shot data: {screenshot.balldata.to_json()}, errors: {screenshot.balldata.errors}")
+                self.bad_shot.emit(screenshot.balldata)
         else:
+            logging.info(f"Process {self.name} same shot do not send to GSPro")
             self.same_shot.emit()
@@ -1,6 +1,5 @@
 import logging
 import traceback
-from threading import Event
 from src.putting_settings import PuttingSettings
 from src.screenshot_exputt import ScreenshotExPutt
 from src.worker_screenshot_device_base import WorkerScreenshotBase
@@ -22,9 +21,8 @@ class WorkerScreenshotDeviceExPutt(WorkerScreenshotBase):
         logging.debug(f'{self.name} Started')
         # Execute if not shutdown
         while not self._shutdown.is_set():
-            Event().wait(self.settings.screenshot_interval/1000)
-            # When _pause is clear we wait(suspended) if set we process
-            self._pause.wait()
+            if not self.wait_for_screenshot():
+                continue
             # Make sure putter selected
             if self.selected_club() != 'PT':
                 logging.debug('Club other than putter selected pausing putt processing')
@@ -40,6 +38,8 @@ class WorkerScreenshotDeviceExPutt(WorkerScreenshotBase):
                     traceback.print_exc()
                     logging.debug(f'Error in process {self.name}: {format(e)}, {traceback.format_exc()}')
                     self.error.emit((e, traceback.format_exc()))
+        self.exputt_screenshot.end_ocr()
+        logging.debug(f'{self.name} capture scheduler: {self.scheduler.stats()}')
         self.finished.emit()
 
     def reload_putting_rois(self):
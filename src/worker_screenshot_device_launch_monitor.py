@@ -1,7 +1,7 @@
 import logging
 import traceback
-from threading import Event
 from src.device import Device
+from src.ocr_process_pool import OcrProcessPool
 from src.screenshot import Screenshot
 from src.worker_screenshot_device_base import WorkerScreenshotBase
 from src.settings import Settings
@@ -19,11 +19,14 @@ class WorkerScreenshotDeviceLaunchMonitor(WorkerScreenshotBase):
     def run(self):
         self.started.emit()
         logging.debug(f'{self.name} Started')
+        ocr_processes = int(getattr(self.settings, 'ocr_processes', 0))
+        if ocr_processes > 0:
+            self.ocr_pool = OcrProcessPool(ocr_processes)
         # Execute if not shutdown
         while not self._shutdown.is_set():
-            Event().wait(self.settings.screenshot_interval/1000)
-            # When _pause is clear we wait(suspended) if set we process
-            self._pause.wait()
+            # Frames still being read by the OCR processes are handled while waiting
+            if not self.wait_for_ocr(self.screenshot):
+                continue
             # Make sure putter not selected
             if self.selected_club() == 'PT':
                 self.pause()
@@ -37,6 +40,12 @@ class WorkerScreenshotDeviceLaunchMonitor(WorkerScreenshotBase):
                     traceback.print_exc()
                     logging.debug(f'Error in process {self.name}: {format(e)}, {traceback.format_exc()}')
                     self.error.emit((e, traceback.format_exc()))
+        self.cancel_ocr()
+        if self.ocr_pool is not None:
+            self.ocr_pool.end()
+            self.ocr_pool = None
+        self.screenshot.end_ocr()
+        logging.debug(f'{self.name} capture scheduler: {self.scheduler.stats()}')
         self.finished.emit()
 
     def change_device(self, device: Device):
@@ -47,6 +56,7 @@ class WorkerScreenshotDeviceLaunchMonitor(WorkerScreenshotBase):
 
     def ignore_shots_after_restart(self):
         self.screenshot.first = True
+        self.screenshot.first_frame = True
 
     def club_selected(self, club):
         super().club_selected(club)